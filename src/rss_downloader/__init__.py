@@ -1,9 +1,15 @@
 """RSS下载器 - 自动从RSS源获取并下载内容"""
 
+import sys
 from importlib.metadata import version
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any
 
 import anyio
 
+if TYPE_CHECKING:
+    from .config import ConfigManager
+
 __version__ = version("rss_downloader")
 
 
@@ -34,12 +40,12 @@ async def async_main() -> None:
             async def run_downloader_periodically():
                 """后台定时执行下载任务"""
                 while True:
+                    started = anyio.current_time()
                     try:
                         await services.rss_downloader.run()
                     except Exception:
                         services.logger.exception("下载器后台任务运行时发生错误")
-                    interval = services.config.web.interval_hours
-                    await anyio.sleep(interval * 3600)
+                    await _wait_next_run(services.config, started)
 
             web_app = create_app(services=services)
             uv_config = uvicorn.Config(
@@ -70,8 +76,26 @@ async def async_main() -> None:
         await services.close()
 
 
+async def _wait_next_run(config: "ConfigManager", started: float) -> None:
+    """等待到下次运行时间，配置热重载后按新的间隔重新计算"""
+    while True:
+        interval = config.web.interval_hours * 3600
+        remaining = started + interval - anyio.current_time()
+        if remaining <= 0:
+            return
+        with anyio.move_on_after(remaining):
+            await config.wait_for_change()
+
+
+def _backend_options() -> dict[str, Any]:
+    """非 Windows 平台且安装了 uvloop 时，使用 uvloop 作为事件循环"""
+    if sys.platform != "win32" and find_spec("uvloop") is not None:
+        return {"use_uvloop": True}
+    return {}
+
+
 def main() -> None:
     try:
-        anyio.run(async_main)
+        anyio.run(async_main, backend_options=_backend_options())
     except KeyboardInterrupt:
         print("\n程序已退出。")
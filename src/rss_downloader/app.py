@@ -1,10 +1,12 @@
 from pathlib import Path
 
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from .services import AppServices
 from .web import router as web_router
+from .web import templates
 
 
 def create_app(services: AppServices) -> FastAPI:
@@ -12,6 +14,11 @@ def create_app(services: AppServices) -> FastAPI:
 
     # 从传入的容器中获取服务实例，并附加到 app.state
     app.state.services = services
+    # 配置页面渲染结果缓存，随应用实例创建，键为访问地址
+    app.state.config_page_cache = {}
+
+    # 下载记录页面的 HTML 较大且重复度高，压缩后传输量可降至数十分之一
+    app.add_middleware(GZipMiddleware, minimum_size=1000)
 
     app.mount(
         "/static",
@@ -20,4 +27,8 @@ def create_app(services: AppServices) -> FastAPI:
     )
     app.include_router(web_router)
 
+    # 预先编译页面模板，首次请求无需解析
+    for name in ("index.html", "config.html"):
+        templates.get_template(name)
+
     return app
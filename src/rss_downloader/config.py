@@ -1,12 +1,15 @@
-import functools
+import hashlib
 import os
+import re
 from collections.abc import Callable, Coroutine
+from functools import lru_cache
 from pathlib import Path as SyncPath
 from typing import Any
 
 import anyio
 import yaml
 from pydantic import ValidationError
+from watchfiles import awatch
 
 from .logger import DummyLogger, LoggerProtocol
 from .models import (
@@ -20,19 +23,92 @@ from .models import (
     WebhookConfig,
 )
 
+try:
+    from yaml import CSafeDumper as SafeDumper
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # 未编译 libyaml 时回退到纯 Python 实现
+    from yaml import SafeDumper, SafeLoader  # type: ignore
+
 CONFIG_FILE = "config.yaml"
 DATABASE_FILE_NAME = "downloads.db"
+WATCH_DEBOUNCE_MS = 200  # 合并编辑器保存时产生的连续文件事件
+WATCH_FALLBACK_POLL_MS = 60_000  # 网络文件系统等无法可靠推送事件时的兜底检查间隔
+
+
+def _load_yaml(content: str | bytes) -> Any:
+    """解析 YAML 文本"""
+    return yaml.load(content, Loader=SafeLoader)
+
+
+def _dump_yaml(data: dict[str, Any]) -> str:
+    """将配置序列化为 YAML 文本"""
+    return yaml.dump(
+        data,
+        Dumper=SafeDumper,
+        allow_unicode=True,
+        sort_keys=False,
+        default_flow_style=False,
+    )
+
+
+def _digest(data: bytes) -> str:
+    """计算配置文件内容摘要，用于判断内容是否真正发生变化"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+# 合并为一个正则后分组编号会偏移，含反向引用或条件分组引用的规则不能合并
+_BACKREFERENCE = re.compile(r"\\[1-9]|\(\?P=|\(\?\(")
+
+
+def _combine_patterns(patterns: tuple[str, ...]) -> tuple[re.Pattern, ...]:
+    """将多条规则合并为一个正则，一次扫描即可判断是否命中任意规则"""
+    if len(patterns) > 1 and not any(_BACKREFERENCE.search(p) for p in patterns):
+        try:
+            combined = "|".join(f"(?:{p})" for p in patterns)
+            return (re.compile(combined, re.IGNORECASE),)
+        except re.error:
+            pass  # 如内联全局标志、重复的命名分组等，回退为逐条匹配
+    return tuple(re.compile(p, re.IGNORECASE) for p in patterns)
+
+
+@lru_cache(maxsize=64)
+def _compile_feed_patterns(
+    include: tuple[str, ...], exclude: tuple[str, ...]
+) -> tuple[tuple[re.Pattern, ...], tuple[re.Pattern, ...]]:
+    """编译过滤规则，以规则内容为键缓存，配置变化后自然使用新的编译结果"""
+    return _combine_patterns(include), _combine_patterns(exclude)
+
+
+@lru_cache(maxsize=1)
+def _default_config_dump() -> dict[str, Any]:
+    """默认配置的序列化结果，只计算一次；_deep_merge 不会修改它"""
+    return Config.model_validate({}).model_dump(mode="json")
+
+
+def _deep_merge_tracking(
+    default: dict[str, Any], user: dict[str, Any]
+) -> tuple[dict[str, Any], bool]:
+    """合并配置，并返回是否补齐了用户配置中缺失的字段"""
+    result = dict(default)
+    added = not user.keys() >= default.keys()
+    # 迭代合并，仅复制需要向下合并的嵌套字典，不修改 default
+    stack = [(result, user)]
+    while stack:
+        target, source = stack.pop()
+        for k, v in source.items():
+            current = target.get(k)
+            if isinstance(v, dict) and isinstance(current, dict):
+                added = added or not v.keys() >= current.keys()
+                target[k] = merged = dict(current)
+                stack.append((merged, v))
+            else:
+                target[k] = v
+    return result, added
 
 
 def _deep_merge(default: dict[str, Any], user: dict[str, Any]) -> dict[str, Any]:
     """合并配置：保留用户已有值，补齐缺失字段"""
-    result = dict(default)
-    for k, v in user.items():
-        if isinstance(v, dict) and isinstance(result.get(k), dict):
-            result[k] = _deep_merge(result[k], v)
-        else:
-            result[k] = v
-    return result
+    return _deep_merge_tracking(default, user)[0]
 
 
 class ConfigManager:
@@ -40,25 +116,26 @@ class ConfigManager:
         self.config_path = config_path
         self._lock = anyio.Lock()
         self._config_version = 0
-        self._config = initial_config
-        self._last_mtime = 0.0
+        # 按源名称缓存编译后的过滤规则，配置替换时清空
+        self._pattern_cache: dict[
+            str, tuple[tuple[re.Pattern, ...], tuple[re.Pattern, ...]]
+        ] = {}
+        self._set_config(initial_config)
+        self._last_signature: tuple[float, int] | None = None  # (mtime, size)
+        self._last_digest: str | None = None
         self._web_mode_enabled = False
         self.logger: LoggerProtocol = DummyLogger()
 
         self._reconfig_callback: Callable[[], Coroutine[Any, Any, None]] | None = None
+        self._change_event: anyio.Event | None = None
 
     @classmethod
     async def create(cls) -> "ConfigManager":
         config_path = await cls._find_config_path()
-        initial_config = await cls._load_or_create(config_path)
+        initial_config, content = await cls._load_or_create(config_path)
         instance = cls(config_path, initial_config)
-
-        try:
-            stat_result = await instance.config_path.stat()
-            instance._last_mtime = stat_result.st_mtime
-        except FileNotFoundError:
-            pass
-
+        # 只记录摘要，首次检查时会重新 stat 并比对内容
+        instance._last_digest = _digest(content)
         return instance
 
     @staticmethod
@@ -78,49 +155,35 @@ class ConfigManager:
         return search_paths[0]  # 如果都不存在，使用第一个路径
 
     @staticmethod
-    async def _load_or_create(config_path: anyio.Path) -> Config:
-        """加载或创建配置文件"""
+    async def _load_or_create(config_path: anyio.Path) -> tuple[Config, bytes]:
+        """加载或创建配置文件，返回配置及文件的最终内容"""
         user_data = {}
-        if await config_path.exists():
-            async with await config_path.open("r", encoding="utf-8") as f:
-                content = await f.read()
-                user_data = (
-                    await anyio.to_thread.run_sync(yaml.safe_load, content) or {}  # type: ignore
-                )
-
-        default_dump = Config.model_validate({}).model_dump(mode="json")
-        merged_config = _deep_merge(default_dump, user_data)
+        content = b""
+        exists = await config_path.exists()
+        if exists:
+            content = await config_path.read_bytes()
+            user_data = await anyio.to_thread.run_sync(_load_yaml, content) or {}
+
+        merged_config, added = _deep_merge_tracking(_default_config_dump(), user_data)
         config_obj = Config.model_validate(merged_config)
 
-        # 仅当文件不存在或内容不完整时才回写
-        if not await config_path.exists() or user_data != merged_config:
+        # 仅当文件不存在或补齐了缺失字段时才回写
+        if not exists or added:
             await config_path.parent.mkdir(parents=True, exist_ok=True)
-            dumped_yaml = await anyio.to_thread.run_sync(  # type: ignore
-                functools.partial(
-                    yaml.safe_dump,
-                    allow_unicode=True,
-                    sort_keys=False,
-                    default_flow_style=False,
-                ),
-                config_obj.model_dump(mode="json"),
+            dumped_yaml = await anyio.to_thread.run_sync(
+                _dump_yaml, config_obj.model_dump(mode="json")
             )
-            async with await config_path.open("w", encoding="utf-8") as f:
-                await f.write(dumped_yaml)
+            content = dumped_yaml.encode("utf-8")
+            await config_path.write_bytes(content)
 
-        return config_obj
+        return config_obj, content
 
-    async def _read_only_load(self) -> Config:
+    @staticmethod
+    async def _read_only_load(content: bytes) -> Config:
         """一个只读的加载方法供热重载使用，避免回写"""
-        user_data = {}
-        if await self.config_path.exists():
-            async with await self.config_path.open("r", encoding="utf-8") as f:
-                content = await f.read()
-                user_data = (
-                    await anyio.to_thread.run_sync(yaml.safe_load, content) or {}  # type: ignore
-                )
-
-        default_dump = Config.model_validate({}).model_dump(mode="json")
-        merged_config = _deep_merge(default_dump, user_data)
+        user_data = await anyio.to_thread.run_sync(_load_yaml, content) or {}
+
+        merged_config = _deep_merge(_default_config_dump(), user_data)
         return Config.model_validate(merged_config)
 
     def set_logger(self, logger: LoggerProtocol) -> None:
@@ -129,32 +192,45 @@ class ConfigManager:
     def get(self) -> Config:
         return self._config
 
+    def get_json(self) -> str:
+        """获取当前配置的 JSON 序列化结果，配置替换前重复调用直接返回缓存"""
+        if self._config_json is None:
+            self._config_json = self._config.model_dump_json()
+        return self._config_json
+
+    def _set_config(
+        self, config: Config, config_dump: dict[str, Any] | None = None
+    ) -> None:
+        """替换当前配置，并缓存其序列化结果供增量更新使用"""
+        self._config = config
+        self._config_dump = (
+            config_dump if config_dump is not None else config.model_dump(mode="json")
+        )
+        # Config 校验保证源名称唯一
+        self._feeds_by_name = {feed.name: feed for feed in config.feeds}
+        self._pattern_cache.clear()
+        self._config_json: str | None = None
+
     async def update(self, new_data: dict[str, Any]) -> None:
         """更新配置并写回文件"""
 
         self.logger.debug(f"尝试更新配置: {new_data}")
 
         async with self._lock:
-            backup_config_dump = self._config.model_dump(mode="json")
-            merged_for_validation = _deep_merge(backup_config_dump, new_data)
+            merged_for_validation = _deep_merge(self._config_dump, new_data)
             try:
-                self._config = Config.model_validate(merged_for_validation)
-                dumped_yaml = await anyio.to_thread.run_sync(  # type: ignore
-                    functools.partial(
-                        yaml.safe_dump,
-                        allow_unicode=True,
-                        sort_keys=False,
-                    ),
-                    self._config.model_dump(mode="json"),
-                )
+                new_config = Config.model_validate(merged_for_validation)
+                new_dump = new_config.model_dump(mode="json")
+                dumped_yaml = await anyio.to_thread.run_sync(_dump_yaml, new_dump)
                 async with await self.config_path.open("w", encoding="utf-8") as f:
                     await f.write(dumped_yaml)
 
             except (ValidationError, OSError) as e:
-                self.logger.error(f"配置更新失败，正在回滚... 错误: {e}")
-                self._config = Config.model_validate(backup_config_dump)
+                self.logger.error(f"配置更新失败，保留原配置。错误: {e}")
                 raise e
 
+            self._set_config(new_config, new_dump)
+
     def initialize(self, tg: anyio.abc.TaskGroup, cli_force_web: bool = False):  # type: ignore
         """根据命令行参数或配置文件启用配置热重载"""
         self._web_mode_enabled = cli_force_web or self._config.web.enabled
@@ -194,26 +270,33 @@ class ConfigManager:
         return self.get().feeds
 
     def get_feed_by_name(self, feed_name: str) -> FeedConfig | None:
-        for feed in self.feeds:
-            if feed.name == feed_name:
-                return feed
-        return None
+        return self._feeds_by_name.get(feed_name)
 
     def get_feed_patterns(self, feed_name: str) -> tuple[list[str], list[str]]:
         """获取指定RSS源的过滤规则"""
-        for feed in self.feeds:
-            if feed.name == feed_name:
-                include_patterns = feed.include
-                exclude_patterns = feed.exclude
-                return include_patterns, exclude_patterns
-        return [], []  # 如果找不到对应的源，返回空规则
+        feed = self._feeds_by_name.get(feed_name)
+        if feed is None:
+            return [], []  # 如果找不到对应的源，返回空规则
+        return feed.include, feed.exclude
+
+    def get_compiled_feed_patterns(
+        self, feed_name: str
+    ) -> tuple[tuple[re.Pattern, ...], tuple[re.Pattern, ...]]:
+        """获取指定RSS源编译后的过滤规则"""
+        try:
+            return self._pattern_cache[feed_name]
+        except KeyError:
+            include_patterns, exclude_patterns = self.get_feed_patterns(feed_name)
+            compiled = _compile_feed_patterns(
+                tuple(include_patterns), tuple(exclude_patterns)
+            )
+            self._pattern_cache[feed_name] = compiled
+            return compiled
 
     def get_feed_downloader(self, feed_name: str) -> Downloader:
         """获取指定RSS源的下载器类型"""
-        for feed in self.feeds:
-            if feed.name == feed_name:
-                return feed.downloader
-        return "aria2"
+        feed = self._feeds_by_name.get(feed_name)
+        return feed.downloader if feed else "aria2"
 
     def get_config_version(self) -> int:
         """获取当前配置的版本号"""
@@ -223,25 +306,76 @@ class ConfigManager:
         """注册一个在配置重载后调用的异步回调函数"""
         self._reconfig_callback = callback
 
-    async def _watch_for_changes(self):
-        """启动后台线程监控文件变化"""
-        self.logger.info(f"正在监控配置文件: {self.config_path}")
+    async def wait_for_change(self) -> None:
+        """等待下一次配置热重载"""
+        if self._change_event is None:
+            self._change_event = anyio.Event()
+        await self._change_event.wait()
 
-        while True:
-            await anyio.sleep(5)
-            try:
-                if await self.config_path.exists():
-                    mtime = (await self.config_path.stat()).st_mtime
-                    if mtime > self._last_mtime:
-                        async with self._lock:
-                            self._config = await self._read_only_load()
-                            self._last_mtime = mtime
-                            self._config_version += 1
+    def _notify_change(self) -> None:
+        """唤醒所有等待配置变化的任务"""
+        if self._change_event is not None:
+            self._change_event.set()
+            self._change_event = None
 
-                        if self._reconfig_callback:
-                            await self._reconfig_callback()
+    async def _reload_if_changed(self):
+        """配置文件内容变化时重新加载配置"""
+        try:
+            # 持锁读取，避免读到 update() 写入过程中被截断的文件
+            async with self._lock:
+                try:
+                    stat_result = await self.config_path.stat()
+                except FileNotFoundError:
+                    return
+
+                signature = (stat_result.st_mtime, stat_result.st_size)
+                if signature == self._last_signature:
+                    return
+
+                content = await self.config_path.read_bytes()
+                digest = _digest(content)
+                if digest == self._last_digest:  # 仅修改时间变化，内容未变
+                    self._last_signature = signature
+                    return
+
+                self._set_config(await self._read_only_load(content))
+                self._last_signature = signature
+                self._last_digest = digest
+                self._config_version += 1
+
+            self._notify_change()
+            if self._reconfig_callback:
+                await self._reconfig_callback()
+
+            self.logger.info(f"配置文件已重新加载: {self.config_path}")
 
-                        self.logger.info(f"配置文件已重新加载: {self.config_path}")
+        except Exception:
+            self.logger.exception("配置文件监控任务出错")
 
-            except Exception:
-                self.logger.exception("配置文件监控任务出错")
+    async def _watch_for_changes(self):
+        """监听配置文件所在目录的文件系统事件，并定期兜底检查"""
+        self.logger.info(f"正在监控配置文件: {self.config_path}")
+
+        stop_event = anyio.Event()
+        config_name = self.config_path.name
+
+        async def stop_on_cancel():
+            # awatch 在线程中阻塞等待事件，取消时需通过 stop_event 通知其退出
+            try:
+                await anyio.sleep_forever()
+            finally:
+                stop_event.set()
+
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(stop_on_cancel)
+            async for _ in awatch(
+                self.config_path.parent,
+                watch_filter=lambda _, path: SyncPath(path).name == config_name,
+                debounce=WATCH_DEBOUNCE_MS,
+                rust_timeout=WATCH_FALLBACK_POLL_MS,
+                yield_on_timeout=True,
+                recursive=False,
+                stop_event=stop_event,
+            ):
+                await self._reload_if_changed()
+            tg.cancel_scope.cancel()
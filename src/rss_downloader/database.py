@@ -1,8 +1,14 @@
 import sqlite3
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Any
 
 import aiosqlite
+import anyio
 from anyio import Path
+from pydantic import TypeAdapter
 
 from .logger import LoggerProtocol
 from .models import DownloadRecord
@@ -22,11 +28,85 @@ def convert_datetime(iso_str: bytes) -> datetime:
 aiosqlite.register_adapter(datetime, adapt_datetime)
 aiosqlite.register_converter("TIMESTAMP", convert_datetime)
 
+# 连接级别的 PRAGMA，在创建连接时设置
+CONNECTION_PRAGMAS = """
+    PRAGMA synchronous = NORMAL;
+    PRAGMA cache_size = -20000;
+    PRAGMA mmap_size = 268435456;
+"""
+# 显式列出查询列，行数据按位置与列名对应，无需逐行 dict(row)
+DOWNLOAD_COLUMNS = (
+    "id",
+    "title",
+    "url",
+    "download_url",
+    "feed_name",
+    "feed_url",
+    "published_time",
+    "download_time",
+    "downloader",
+    "status",
+    "mode",
+)
+SELECT_DOWNLOADS_SQL = f"SELECT {', '.join(DOWNLOAD_COLUMNS)} FROM downloads"
+
+# 一次调用批量验证多行记录
+DOWNLOAD_RECORDS_ADAPTER = TypeAdapter(list[DownloadRecord])
+
+# 单条 SQL 中 ? 占位符数量上限，低于 SQLITE_MAX_VARIABLE_NUMBER 的旧默认值 999
+MAX_SQL_VARIABLES = 900
+
+# 搜索结果缓存，本进程的写入会立即清空缓存，过期时间用于兜底其他进程的写入
+SEARCH_CACHE_TTL = 60  # 秒
+SEARCH_CACHE_SIZE = 128
+
+# 搜索结果的排序，id 作为最后的排序键保证顺序唯一
+SEARCH_ORDER_SQL = "ORDER BY download_time DESC, feed_name, published_time DESC, id"
+# 键集分页：取排在上一页最后一条记录 (download_time, feed_name, published_time, id) 之后的记录
+# 首个条件可直接走 download_time 索引的范围扫描，不再逐行跳过 OFFSET
+KEYSET_SQL = """download_time <= ? AND (
+    download_time < ? OR (download_time = ? AND (
+        feed_name > ? OR (feed_name = ? AND (
+            published_time < ? OR (published_time = ? AND id > ?)
+        ))
+    ))
+)"""
+
+INSERT_DOWNLOAD_SQL = """
+    INSERT INTO downloads (
+        title, url, download_url, feed_name, feed_url,
+        published_time, download_time, downloader, status, mode
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _record_params(record: DownloadRecord) -> tuple:
+    """将下载记录转换为插入语句的参数"""
+    return (
+        record.title,
+        str(record.url),
+        str(record.download_url),
+        record.feed_name,
+        str(record.feed_url),
+        record.published_time,
+        record.download_time,
+        record.downloader,
+        record.status,
+        record.mode,
+    )
+
 
 class Database:
     def __init__(self, db_path: Path, logger: LoggerProtocol):
         self.db_path = db_path
         self.logger = logger
+        self._conn: aiosqlite.Connection | None = None
+        self._conn_lock = anyio.Lock()
+        self._write_lock = anyio.Lock()  # 共享连接上的事务不能交错
+        self._search_cache: dict[
+            tuple, tuple[float, tuple[list[DownloadRecord], int]]
+        ] = {}
+        self._search_generation = 0  # 每次写入递增，防止写入前发起的查询回填旧结果
 
     @classmethod
     async def create(cls, db_path: Path, logger: LoggerProtocol) -> "Database":
@@ -35,12 +115,32 @@ class Database:
         await instance._init_db()
         return instance
 
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[aiosqlite.Connection]:
+        """获取复用的数据库连接，首次使用时创建"""
+        if self._conn is None:
+            async with self._conn_lock:
+                if self._conn is None:
+                    conn = await aiosqlite.connect(
+                        self.db_path,  # type: ignore
+                        detect_types=sqlite3.PARSE_DECLTYPES,
+                        isolation_level=None,  # 自动提交，多语句事务需显式 BEGIN
+                    )
+                    conn.row_factory = aiosqlite.Row
+                    await conn.executescript(CONNECTION_PRAGMAS)
+                    self._conn = conn
+        yield self._conn
+
+    async def close(self):
+        """关闭数据库连接"""
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+
     async def _init_db(self):
         """初始化数据库表"""
-        async with aiosqlite.connect(
-            self.db_path,  # type: ignore
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        ) as conn:
+        async with self._connection() as conn:
+            await conn.execute("PRAGMA journal_mode = WAL")  # 持久化在数据库文件中
             await conn.execute("""
                 CREATE TABLE IF NOT EXISTS downloads (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -56,59 +156,77 @@ class Database:
                     mode INTEGER DEFAULT 0              -- 0自动下载，1手动下载
                 )
             """)
-            await conn.commit()
+            await conn.execute("""
+                CREATE TABLE IF NOT EXISTS feed_cache (
+                    feed_name TEXT PRIMARY KEY,         -- RSS源名称
+                    config_hash TEXT NOT NULL,          -- 源配置摘要
+                    etag TEXT,                          -- 响应的 ETag
+                    last_modified TEXT,                 -- 响应的 Last-Modified
+                    body_hash TEXT                      -- 响应内容摘要
+                )
+            """)
+            await conn.executescript("""
+                -- 覆盖 search_downloads 的排序
+                CREATE INDEX IF NOT EXISTS idx_downloads_download_time
+                    ON downloads (download_time DESC, feed_name, published_time DESC);
+                -- 覆盖 is_downloaded 查询
+                CREATE INDEX IF NOT EXISTS idx_downloads_status_url
+                    ON downloads (status, download_url);
+                CREATE INDEX IF NOT EXISTS idx_downloads_published_time
+                    ON downloads (published_time);
+            """)
+
+    def _invalidate_search_cache(self) -> None:
+        """下载记录变化后清空搜索结果缓存"""
+        self._search_generation += 1
+        self._search_cache.clear()
 
     async def reset(self):
         """重置数据库"""
-        async with aiosqlite.connect(
-            self.db_path,  # type: ignore
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        ) as conn:
+        async with self._connection() as conn:
             await conn.execute("DROP TABLE IF EXISTS downloads")
-            await conn.commit()
+            await conn.execute("DROP TABLE IF EXISTS feed_cache")
+        self._invalidate_search_cache()
         await self._init_db()
 
     async def insert(self, record: DownloadRecord) -> int:
         """添加下载记录"""
         try:
-            async with aiosqlite.connect(
-                self.db_path,  # type: ignore
-                detect_types=sqlite3.PARSE_DECLTYPES,
-            ) as conn:
+            async with self._write_lock, self._connection() as conn:
                 async with conn.cursor() as cursor:
-                    await cursor.execute(
-                        """
-                        INSERT INTO downloads (
-                            title, url, download_url, feed_name, feed_url,
-                            published_time, download_time, downloader, status, mode
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            record.title,
-                            str(record.url),
-                            str(record.download_url),
-                            record.feed_name,
-                            str(record.feed_url),
-                            record.published_time,
-                            record.download_time,
-                            record.downloader,
-                            record.status,
-                            record.mode,
-                        ),
-                    )
-                    await conn.commit()
+                    await cursor.execute(INSERT_DOWNLOAD_SQL, _record_params(record))
+                    self._invalidate_search_cache()
                     return cursor.lastrowid  # type: ignore
 
         except Exception as e:
             self.logger.error(f"添加下载记录失败: {e}")
             return 0
 
+    async def insert_many(self, records: list[DownloadRecord]) -> int:
+        """在单个事务中批量添加下载记录，返回写入的条数"""
+        if not records:
+            return 0
+        try:
+            async with self._write_lock, self._connection() as conn:
+                await conn.execute("BEGIN")
+                try:
+                    await conn.executemany(
+                        INSERT_DOWNLOAD_SQL, [_record_params(r) for r in records]
+                    )
+                except BaseException:
+                    await conn.rollback()
+                    raise
+                await conn.commit()
+                self._invalidate_search_cache()
+                return len(records)
+
+        except Exception as e:
+            self.logger.error(f"批量添加下载记录失败: {e}")
+            return 0
+
     async def is_downloaded(self, url: str) -> bool:
         """检查URL是否已经下载过"""
-        async with aiosqlite.connect(
-            self.db_path,  # type: ignore
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        ) as conn:
+        async with self._connection() as conn:
             async with conn.cursor() as cursor:
                 await cursor.execute(
                     "SELECT COUNT(*) FROM downloads WHERE status = 1 and download_url = ?",
@@ -117,20 +235,66 @@ class Database:
                 result = await cursor.fetchone()
                 return result[0] > 0 if result else False
 
+    async def filter_new(self, urls: list[str]) -> set[str]:
+        """返回尚未成功下载过的 URL"""
+        downloaded: set[str] = set()
+        unique_urls = list(dict.fromkeys(urls))
+        async with self._connection() as conn:
+            for i in range(0, len(unique_urls), MAX_SQL_VARIABLES):
+                chunk = unique_urls[i : i + MAX_SQL_VARIABLES]
+                placeholders = ",".join("?" * len(chunk))
+                async with conn.execute(
+                    "SELECT download_url FROM downloads"
+                    f" WHERE status = 1 AND download_url IN ({placeholders})",
+                    chunk,
+                ) as cursor:
+                    downloaded.update(row[0] for row in await cursor.fetchall())
+        return set(unique_urls) - downloaded
+
+    async def get_feed_cache(
+        self, feed_name: str, config_hash: str
+    ) -> tuple[str | None, str | None, str | None] | None:
+        """获取RSS源上次成功处理时的 ETag、Last-Modified 和内容摘要，源配置变化后失效"""
+        async with self._connection() as conn:
+            async with conn.execute(
+                "SELECT etag, last_modified, body_hash FROM feed_cache"
+                " WHERE feed_name = ? AND config_hash = ?",
+                (feed_name, config_hash),
+            ) as cursor:
+                row = await cursor.fetchone()
+                return tuple(row) if row else None  # type: ignore
+
+    async def save_feed_cache(
+        self,
+        feed_name: str,
+        config_hash: str,
+        etag: str | None,
+        last_modified: str | None,
+        body_hash: str | None,
+    ) -> None:
+        """保存RSS源的条件请求信息"""
+        async with self._write_lock, self._connection() as conn:
+            await conn.execute(
+                "INSERT OR REPLACE INTO feed_cache"
+                " (feed_name, config_hash, etag, last_modified, body_hash)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (feed_name, config_hash, etag, last_modified, body_hash),
+            )
+
     async def search_download_by_id(self, id: int) -> DownloadRecord | None:
         """通过ID获取下载记录"""
-        async with aiosqlite.connect(
-            self.db_path,  # type: ignore
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        ) as conn:
-            conn.row_factory = aiosqlite.Row
+        async with self._connection() as conn:
             async with conn.cursor() as cursor:
-                await cursor.execute("SELECT * FROM downloads WHERE id = ?", (id,))
+                await cursor.execute(f"{SELECT_DOWNLOADS_SQL} WHERE id = ?", (id,))
                 row = await cursor.fetchone()
-                return DownloadRecord.model_validate(dict(row)) if row else None
+                if not row:
+                    return None
+                return DownloadRecord.model_validate(
+                    dict(zip(DOWNLOAD_COLUMNS, row, strict=True))
+                )
 
-    async def search_downloads(
-        self,
+    @staticmethod
+    def _build_where(
         title: str | None = None,
         feed_name: str | None = None,
         downloader: str | None = None,
@@ -140,70 +304,116 @@ class Database:
         published_end_time: datetime | None = None,
         download_start_time: datetime | None = None,
         download_end_time: datetime | None = None,
-        limit: int = 20,
-        offset: int = 0,
-    ) -> tuple[list[DownloadRecord], int]:
-        """搜索下载记录"""
-        query_parts = ["SELECT * FROM downloads WHERE 1=1"]
-        params = []
+    ) -> tuple[str, list[Any]]:
+        """构建搜索条件的 WHERE 子句及其参数"""
+        conditions = []
+        params: list[Any] = []
 
         if title:
-            query_parts.append("AND title LIKE ?")
+            conditions.append("title LIKE ?")
             params.append(f"%{title}%")
         if feed_name:
-            query_parts.append("AND feed_name LIKE ?")
+            conditions.append("feed_name LIKE ?")
             params.append(f"%{feed_name}%")
         if downloader:
-            query_parts.append("AND downloader = ?")
+            conditions.append("downloader = ?")
             params.append(downloader)
         if status is not None:
-            query_parts.append("AND status = ?")
+            conditions.append("status = ?")
             params.append(status)
         if mode is not None:
-            query_parts.append("AND mode = ?")
+            conditions.append("mode = ?")
             params.append(mode)
         if published_start_time:
-            query_parts.append("AND published_time >= ?")
+            conditions.append("published_time >= ?")
             params.append(published_start_time)
         if published_end_time:
-            query_parts.append("AND published_time <= ?")
+            conditions.append("published_time <= ?")
             params.append(published_end_time)
         if download_start_time:
-            query_parts.append("AND download_time >= ?")
+            conditions.append("download_time >= ?")
             params.append(download_start_time)
         if download_end_time:
-            query_parts.append("AND download_time <= ?")
+            conditions.append("download_time <= ?")
             params.append(download_end_time)
 
-        count_params = list(params)
+        where_sql = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        return where_sql, params
 
-        async with aiosqlite.connect(
-            self.db_path,  # type: ignore
-            detect_types=sqlite3.PARSE_DECLTYPES,
-        ) as conn:
-            conn.row_factory = aiosqlite.Row
+    async def search_downloads(
+        self,
+        title: str | None = None,
+        feed_name: str | None = None,
+        downloader: str | None = None,
+        status: int | None = None,
+        mode: int | None = None,
+        published_start_time: datetime | None = None,
+        published_end_time: datetime | None = None,
+        download_start_time: datetime | None = None,
+        download_end_time: datetime | None = None,
+        limit: int = 20,
+        offset: int = 0,
+        after: tuple[datetime, str, datetime, int] | None = None,
+    ) -> tuple[list[DownloadRecord], int]:
+        """搜索下载记录，提供 after 时从该排序键之后开始取数据并忽略 offset"""
+        where_sql, params = self._build_where(
+            title=title,
+            feed_name=feed_name,
+            downloader=downloader,
+            status=status,
+            mode=mode,
+            published_start_time=published_start_time,
+            published_end_time=published_end_time,
+            download_start_time=download_start_time,
+            download_end_time=download_end_time,
+        )
+
+        cache_key = (where_sql, tuple(params), limit, offset, after)
+        cached = self._search_cache.get(cache_key)
+        if cached and time.monotonic() - cached[0] < SEARCH_CACHE_TTL:
+            return cached[1]
+        generation = self._search_generation
 
+        async with self._connection() as conn:
             # 获取总数
-            async with conn.cursor() as cursor:
-                count_query = (
-                    "SELECT COUNT(*) FROM ("
-                    + " ".join(query_parts).replace("SELECT *", "SELECT id")
-                    + ")"
-                )
-                await cursor.execute(count_query, count_params)
+            async with conn.execute(
+                f"SELECT COUNT(*) FROM downloads {where_sql}", params
+            ) as cursor:
                 total_count_result = await cursor.fetchone()
                 total_count = total_count_result[0] if total_count_result else 0
 
             # 获取数据
-            async with conn.cursor() as cursor:
-                query_parts.append(
-                    "ORDER BY download_time DESC, feed_name, published_time DESC LIMIT ? OFFSET ?"
+            page_where, page_params = where_sql, [*params]
+            if after:
+                download_time, feed_name, published_time, last_id = after
+                page_where = (
+                    f"{where_sql} AND {KEYSET_SQL}"
+                    if where_sql
+                    else f"WHERE {KEYSET_SQL}"
                 )
-                params.extend([limit, offset])
-                sql = " ".join(query_parts)
-                self.logger.debug(f"查询下载记录SQL: {sql}, 参数: {params}")
-                await cursor.execute(sql, params)
+                page_params += [
+                    download_time,
+                    download_time,
+                    download_time,
+                    feed_name,
+                    feed_name,
+                    published_time,
+                    published_time,
+                    last_id,
+                ]
+                offset = 0
+            sql = f"{SELECT_DOWNLOADS_SQL} {page_where} {SEARCH_ORDER_SQL} LIMIT ? OFFSET ?"
+            page_params += [limit, offset]
+            self.logger.debug(f"查询下载记录SQL: {sql}, 参数: {page_params}")
+            async with conn.execute(sql, page_params) as cursor:
                 rows = await cursor.fetchall()
-                results = [DownloadRecord.model_validate(dict(row)) for row in rows]
+                results = DOWNLOAD_RECORDS_ADAPTER.validate_python(
+                    [dict(zip(DOWNLOAD_COLUMNS, row, strict=True)) for row in rows]
+                )
 
-            return results, total_count
+        if generation == self._search_generation:
+            if len(self._search_cache) >= SEARCH_CACHE_SIZE:
+                # 按插入顺序淘汰最早的缓存
+                del self._search_cache[next(iter(self._search_cache))]
+            self._search_cache[cache_key] = (time.monotonic(), (results, total_count))
+        return results, total_count
@@ -1,23 +1,66 @@
 import abc
+import random
+import ssl
+from functools import lru_cache
 from typing import Any
 from urllib.parse import urljoin
 
+import anyio
 import httpx
 
 from .logger import LoggerProtocol
 
+# 下载器多为本地服务，少量长连接即可复用，无需为每个任务新建连接
+CONNECTION_LIMITS = httpx.Limits(max_connections=16, max_keepalive_connections=4)
+CONNECT_RETRIES = 3  # 仅重试建立连接失败的情况，已发出的请求不会重复提交
+ARIA2_MULTICALL_BATCH = 100  # 单次 multicall 的最大子调用数，避免请求过大而超时
+
+# 下载器重启或经过反向代理时可能短暂返回网关错误，此时请求尚未被处理，可安全重试
+RETRY_STATUS_CODES = frozenset({502, 503, 504})
+MAX_RETRIES = 3
+RETRY_BACKOFF_BASE = 0.3  # 秒
+RETRY_BACKOFF_CAP = 5.0  # 秒
+
+
+@lru_cache(maxsize=1)
+def _ssl_context() -> ssl.SSLContext:
+    """所有下载器客户端共用的 SSL 上下文，加载 CA 证书较慢，只创建一次"""
+    return httpx.create_ssl_context()
+
 
 class BaseClient(abc.ABC):
     """下载器客户端的抽象基类"""
 
     def __init__(self, logger: LoggerProtocol):
         self.logger = logger
-        self.session = httpx.AsyncClient()
+        self.session = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(
+                verify=_ssl_context(),
+                limits=CONNECTION_LIMITS,
+                retries=CONNECT_RETRIES,
+            ),
+        )
 
     async def aclose(self):
         """关闭 http 客户端会话"""
         await self.session.aclose()
 
+    async def _post(self, url: str, **kwargs: Any) -> httpx.Response:
+        """发送 POST 请求，遇到网关错误时按带随机抖动的指数退避重试"""
+        for attempt in range(MAX_RETRIES):
+            response = await self.session.post(url, **kwargs)
+            if response.status_code not in RETRY_STATUS_CODES:
+                return response
+            delay = random.uniform(
+                0, min(RETRY_BACKOFF_CAP, RETRY_BACKOFF_BASE * 2**attempt)
+            )
+            self.logger.warning(
+                f"下载器返回 {response.status_code}，{delay:.2f} 秒后重试"
+                f" ({attempt + 1}/{MAX_RETRIES})"
+            )
+            await anyio.sleep(delay)
+        return await self.session.post(url, **kwargs)
+
     @abc.abstractmethod
     async def add_link(self, link: str) -> Any:
         """添加下载链接的抽象方法"""
@@ -46,17 +89,19 @@ class Aria2Client(BaseClient):
         self, method: str, params: list[Any] | None = None
     ) -> dict[str, Any]:
         """准备 RPC 请求数据"""
-        if params is None:
-            params = []
-        if self.secret:
-            params.insert(0, f"token:{self.secret}")
         return {
             "jsonrpc": "2.0",
             "id": "rss-downloader",
             "method": method,
-            "params": params,
+            "params": params if params is not None else [],
         }
 
+    def _with_token(self, params: list[Any]) -> list[Any]:
+        """在 RPC 参数前加上 secret token"""
+        if self.secret:
+            return [f"token:{self.secret}", *params]
+        return params
+
     @classmethod
     async def create(
         cls,
@@ -71,25 +116,63 @@ class Aria2Client(BaseClient):
                 await instance.get_version()
                 logger.success("Aria2 连接成功")
             except Exception as e:
+                await instance.aclose()
                 raise ConnectionError("无法连接到 Aria2，请检查配置或服务状态") from e
         return instance
 
+    def _add_params(self, link: str) -> list[Any]:
+        """构造 aria2.addUri 的参数"""
+        params: list[Any] = [[link]]
+        if self.dir:
+            params.append({"dir": self.dir})
+        return params
+
     async def add_link(self, link: str) -> dict[str, Any]:
         """添加下载任务"""
-        options = {}
-        if self.dir:
-            options["dir"] = self.dir
-        params: list[list[str] | dict[str, Any]] = [[link]]
-        if options:
-            params.append(options)
-        data = self._prepare_request("aria2.addUri", params)
-        response = await self.session.post(self.rpc_url, json=data, timeout=10)
+        data = self._prepare_request(
+            "aria2.addUri", self._with_token(self._add_params(link))
+        )
+        response = await self._post(self.rpc_url, json=data, timeout=10)
         response.raise_for_status()
         return response.json()
 
+    async def add_links(self, links: list[str]) -> list[dict[str, Any]]:
+        """通过 system.multicall 批量添加下载任务，每批一次请求
+
+        返回与 links 一一对应的结果，格式同 add_link: {"result": gid} 或 {"error": ...}
+        """
+        results: list[dict[str, Any]] = []
+        for i in range(0, len(links), ARIA2_MULTICALL_BATCH):
+            results.extend(
+                await self._multicall_add(links[i : i + ARIA2_MULTICALL_BATCH])
+            )
+        return results
+
+    async def _multicall_add(self, links: list[str]) -> list[dict[str, Any]]:
+        """在一次 system.multicall 请求中添加一批下载任务"""
+        calls = [
+            {
+                "methodName": "aria2.addUri",
+                "params": self._with_token(self._add_params(link)),
+            }
+            for link in links
+        ]
+        # system.multicall 本身不需要 token，token 位于每个子调用的参数中
+        data = self._prepare_request("system.multicall", [calls])
+        response = await self._post(self.rpc_url, json=data, timeout=30)
+        response.raise_for_status()
+        body = response.json()
+        if "error" in body:
+            return [{"error": body["error"]} for _ in links]
+        # 成功的子调用结果为 [gid]，失败的为 {"code": ..., "message": ...}
+        return [
+            {"result": r[0]} if isinstance(r, list) else {"error": r}
+            for r in body["result"]
+        ]
+
     async def get_version(self) -> dict[str, Any]:
         """获取 Aria2 版本信息以测试连接"""
-        data = self._prepare_request("aria2.getVersion")
+        data = self._prepare_request("aria2.getVersion", self._with_token([]))
         response = await self.session.post(self.rpc_url, json=data, timeout=5)
         response.raise_for_status()
         return response.json()
@@ -107,12 +190,15 @@ class QBittorrentClient(BaseClient):
         self.base_url = host
         self.username = username
         self.password = password
+        # 接口地址固定，初始化时拼接一次
+        self.login_url = urljoin(host, "/api/v2/auth/login")
+        self.add_url = urljoin(host, "/api/v2/torrents/add")
+        self.version_url = urljoin(host, "/api/v2/app/version")
 
     async def _login(self, username: str, password: str):
         """登录到qBittorrent WebUI"""
-        login_url = urljoin(self.base_url, "/api/v2/auth/login")
         data = {"username": username, "password": password}
-        response = await self.session.post(login_url, data=data, timeout=10)
+        response = await self.session.post(self.login_url, data=data, timeout=10)
         response.raise_for_status()
         if response.text.strip().lower() != "ok.":
             raise Exception(f"登录认证失败: {response.text}")
@@ -131,6 +217,7 @@ class QBittorrentClient(BaseClient):
                 await instance._login(username, password)
                 logger.success("qBittorrent 连接成功")
             except Exception as e:
+                await instance.aclose()
                 raise ConnectionError(
                     "无法连接到 qBittorrent，请检查配置或服务状态"
                 ) from e
@@ -142,9 +229,8 @@ class QBittorrentClient(BaseClient):
 
     async def add_link(self, link: str) -> bool:
         """添加下载任务"""
-        add_url = urljoin(self.base_url, "/api/v2/torrents/add")
         data = {"urls": link}
-        response = await self.session.post(add_url, data=data, timeout=10)
+        response = await self._post(self.add_url, data=data, timeout=10)
         response.raise_for_status()
         if response.text.strip().lower() == "ok.":
             return True
@@ -153,8 +239,7 @@ class QBittorrentClient(BaseClient):
 
     async def get_version(self) -> dict[str, str]:
         """获取 qBittorrent 版本信息以测试连接"""
-        version_url = urljoin(self.base_url, "/api/v2/app/version")
-        response = await self.session.get(version_url, timeout=5)
+        response = await self.session.get(self.version_url, timeout=5)
         response.raise_for_status()
         return {"version": response.text}
 
@@ -200,7 +285,7 @@ class TransmissionClient(BaseClient):
         payload = {"method": method, "arguments": arguments or {}}
 
         try:
-            response = await self.session.post(
+            response = await self._post(
                 self.rpc_url,
                 json=payload,
                 headers=headers,  # type: ignore
@@ -237,6 +322,7 @@ class TransmissionClient(BaseClient):
             await instance.get_version()
             logger.success("Transmission 连接成功")
         except Exception as e:
+            await instance.aclose()
             raise ConnectionError(
                 "无法连接到 Transmission，请检查配置或服务状态"
             ) from e
@@ -96,6 +96,8 @@ async def setup_logger(config):
         format="{time:YYYY-MM-DD HH:mm:ss} | {level:<8} | {name:<25}:{line:>4} - {message}",
         level=log_level,
         encoding="utf-8",
+        # 写文件、轮转压缩和异常格式化在后台线程完成，不阻塞事件循环；退出时 loguru 会清空队列
+        enqueue=True,
     )
 
     # 配置拦截器以统一日志格式
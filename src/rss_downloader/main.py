@@ -12,6 +12,8 @@ from .models import Downloader, DownloadRecord
 from .parser import RSSParser
 from .webhook import WebhookService
 
+SUBMIT_CONCURRENCY = 8  # 单个源同时提交到下载器的最大任务数
+
 
 class DownloaderError(Exception):
     pass
@@ -42,13 +44,10 @@ class RSSDownloader:
         self.transmission = transmission
         self.webhook_service = webhook_service
 
-    async def _send_to_downloader(
-        self,
-        item: dict[str, Any],
-        downloader_name: Downloader,
-        mode: Literal[0, 1] = 0,
-    ) -> None:
-        """发送单个下载任务到指定下载器"""
+    async def _submit_link(
+        self, link: str, downloader_name: Downloader
+    ) -> tuple[bool, str]:
+        """提交单个下载链接到指定下载器，返回是否成功及错误信息"""
         status = False
         error_message = ""
         downloader_client = None
@@ -57,7 +56,7 @@ class RSSDownloader:
             if downloader_name == "aria2":
                 downloader_client = self.aria2
                 if downloader_client:
-                    result = await downloader_client.add_link(str(item["download_url"]))
+                    result = await downloader_client.add_link(link)
                     if "error" in result:
                         error_message = result.get("error", "未知错误")
                     else:
@@ -68,7 +67,7 @@ class RSSDownloader:
             elif downloader_name == "qbittorrent":
                 downloader_client = self.qbittorrent
                 if downloader_client:
-                    if await downloader_client.add_link(str(item["download_url"])):
+                    if await downloader_client.add_link(link):
                         status = True
                 else:
                     error_message = "下载器 qbittorrent 未配置或不可用"
@@ -76,7 +75,7 @@ class RSSDownloader:
             elif downloader_name == "transmission":
                 downloader_client = self.transmission
                 if downloader_client:
-                    result = await downloader_client.add_link(str(item["download_url"]))
+                    result = await downloader_client.add_link(link)
                     if result.get("result") == "success":
                         status = True
                     else:
@@ -92,18 +91,68 @@ class RSSDownloader:
             error_message = str(e)
             status = False
 
-        record = DownloadRecord(
+        return status, error_message
+
+    async def _submit_links(
+        self, links: list[str], downloader_name: Downloader
+    ) -> list[tuple[bool, str]]:
+        """批量提交下载链接，aria2 通过 multicall 一次提交，其余下载器并发提交"""
+        if downloader_name == "aria2" and self.aria2 and len(links) > 1:
+            try:
+                results = await self.aria2.add_links(links)
+            except Exception as e:
+                self.logger.exception("与下载器 aria2 通信时发生意外错误")
+                return [(False, str(e))] * len(links)
+            return [
+                (False, result["error"]) if "error" in result else (True, "")
+                for result in results
+            ]
+
+        results: list[tuple[bool, str]] = [(False, "")] * len(links)
+        limiter = anyio.CapacityLimiter(SUBMIT_CONCURRENCY)
+
+        async def submit(index: int, link: str):
+            async with limiter:
+                results[index] = await self._submit_link(link, downloader_name)
+
+        # 各任务的 RPC 往返相互重叠，总耗时由 sum(RTT) 降为约 max(RTT)
+        async with anyio.create_task_group() as tg:
+            for index, link in enumerate(links):
+                tg.start_soon(submit, index, link)
+        return results
+
+    @staticmethod
+    def _build_record(
+        item: dict[str, Any],
+        downloader_name: Downloader,
+        status: bool,
+        mode: Literal[0, 1] = 0,
+        download_time: datetime | None = None,
+    ) -> DownloadRecord:
+        """根据条目和提交结果构建下载记录"""
+        return DownloadRecord(
             title=item["title"],
             url=item["url"],
             download_url=item["download_url"],
             feed_name=item["feed_name"],
             feed_url=item["feed_url"],
             published_time=item["published_time"],
-            download_time=datetime.now(),
+            download_time=download_time or datetime.now(),
             downloader=downloader_name,
             status=1 if status else 0,
             mode=mode,
         )
+
+    async def _record_result(
+        self,
+        item: dict[str, Any],
+        downloader_name: Downloader,
+        status: bool,
+        error_message: str,
+        mode: Literal[0, 1] = 0,
+    ) -> None:
+        """记录下载结果并发送通知，失败时抛出 DownloaderError"""
+        record = self._build_record(item, downloader_name, status, mode)
         new_id = await self.db.insert(record)
 
         await self.webhook_service.send(record)
@@ -118,6 +167,18 @@ class RSSDownloader:
             )
             raise DownloaderError(f"任务添加失败 ({downloader_name}): {error_message}")
 
+    async def _send_to_downloader(
+        self,
+        item: dict[str, Any],
+        downloader_name: Downloader,
+        mode: Literal[0, 1] = 0,
+    ) -> None:
+        """发送单个下载任务到指定下载器"""
+        status, error_message = await self._submit_link(
+            str(item["download_url"]), downloader_name
+        )
+        await self._record_result(item, downloader_name, status, error_message, mode)
+
     async def redownload(self, id: int, downloader: Downloader) -> None:
         """重新下载指定 ID 的任务"""
         record = await self.db.search_download_by_id(id)
@@ -134,23 +195,63 @@ class RSSDownloader:
     ) -> tuple[int, int, int]:
         """处理单个RSS源，返回总数，匹配条目数和下载数"""
         success = 0
-        total_items, matched_items = await self.parser.parse_feed(feed_name, feed_url)
+        total_items, matched_items, feed_cache = await self.parser.parse_feed(
+            feed_name, feed_url
+        )
         downloader_name = self.config.get_feed_downloader(feed_name)
 
-        for item in matched_items:
-            if await self.db.is_downloaded(str(item.download_url)):
+        # 链接只转换一次字符串，供查询和提交共用
+        matched_urls = [str(item.download_url) for item in matched_items]
+        # 一次查询筛出未下载的链接，避免逐条查询数据库
+        new_urls = await self.db.filter_new(matched_urls)
+
+        new_items = []
+        new_links = []
+        for item, download_url in zip(matched_items, matched_urls, strict=True):
+            if download_url not in new_urls:
                 self.logger.info(f"跳过已下载项目: {item.title}")
                 continue
+            new_urls.discard(download_url)  # 同一源内重复的链接只提交一次
+            new_items.append(item)
+            new_links.append(download_url)
 
-            data = item.model_dump() | {"feed_name": feed_name, "feed_url": feed_url}
+        submissions = await self._submit_links(new_links, downloader_name)
+
+        # 同一批记录共用源信息和写入时间
+        feed_fields = {"feed_name": feed_name, "feed_url": feed_url}
+        download_time = datetime.now()
+        records = [
+            self._build_record(
+                item.model_dump() | feed_fields,
+                downloader_name,
+                status,
+                download_time=download_time,
+            )
+            for item, (status, _) in zip(new_items, submissions, strict=True)
+        ]
+        # 整个源的结果在一个事务中写入
+        inserted = await self.db.insert_many(records)
 
+        for record, (status, error_message) in zip(records, submissions, strict=True):
             try:
-                await self._send_to_downloader(data, downloader_name)
-                success += 1
-            except DownloaderError as e:
-                self.logger.error(f"处理失败 '{item.title}' : {e}")
+                await self.webhook_service.send(record)
             except Exception:
-                self.logger.exception(f"下载时发生未知错误: {item.title}")
+                self.logger.exception(f"发送通知时发生未知错误: {record.title}")
+
+            if status:
+                success += 1
+                self.logger.info(
+                    f"下载任务添加成功 ({downloader_name}): {record.title}"
+                )
+            else:
+                self.logger.error(
+                    f"处理失败 '{record.title}' : "
+                    f"任务添加失败 ({downloader_name}): {error_message}"
+                )
+
+        # 全部任务提交成功且已写入数据库后才保存条件请求信息，否则下次运行重新获取并重试
+        if feed_cache and success == len(new_items) and inserted == len(records):
+            await self.db.save_feed_cache(*feed_cache)
 
         return total_items, len(matched_items), success
 
@@ -1,4 +1,4 @@
-import time
+import calendar
 from datetime import datetime
 from typing import Annotated, Any, Literal, TypeAlias
 
@@ -60,6 +60,11 @@ EXTRACTOR_DOMAIN_MAP = {
     "nyaa": ("nyaa.si",),
 }
 
+# 域名到提取器的反向索引，按主机名后缀逐级查找
+DOMAIN_TO_EXTRACTOR = {
+    domain: name for name, domains in EXTRACTOR_DOMAIN_MAP.items() for domain in domains
+}
+
 Downloader: TypeAlias = Literal["aria2", "qbittorrent", "transmission"]
 
 
@@ -75,9 +80,10 @@ class FeedConfig(BaseModel):
     def set_content_extractor_from_url(self) -> "FeedConfig":
         """根据 url 自动设置 content_extractor"""
         if self.content_extractor == "default" and self.url and self.url.host:
-            hostname = self.url.host.lower()
-            for extractor_name, domains in EXTRACTOR_DOMAIN_MAP.items():
-                if any(hostname.endswith(domain) for domain in domains):
+            labels = self.url.host.lower().split(".")
+            for i in range(len(labels) - 1):
+                extractor_name = DOMAIN_TO_EXTRACTOR.get(".".join(labels[i:]))
+                if extractor_name:
                     self.content_extractor = extractor_name
                     break
 
@@ -164,6 +170,31 @@ class ParsedItem(BaseModel):
     published_time: datetime
 
 
+def _entry_fields(data: FeedParserDict, download_url: Any) -> dict[str, Any]:
+    """提取各解析模型共用的条目字段"""
+    # FeedParserDict 的属性访问经 __getattr__ 转发且缺失时抛异常，统一使用 get 取值
+    entry_id = data.get("id")
+    if entry_id and entry_id.startswith("http"):
+        url = entry_id
+    else:
+        url = data.get("link")
+
+    # feedparser 的 published_parsed 为 UTC 时间，需按 UTC 转换为时间戳
+    published_parsed = data.get("published_parsed")
+    published_time = (
+        datetime.fromtimestamp(calendar.timegm(published_parsed))
+        if published_parsed
+        else datetime.now()
+    )
+
+    return {
+        "title": data.get("title", "No Title"),
+        "url": url,
+        "download_url": download_url,
+        "published_time": published_time,
+    }
+
+
 class TorrentEntryMixin:
     @model_validator(mode="before")
     @classmethod
@@ -171,34 +202,18 @@ class TorrentEntryMixin:
         if not isinstance(data, FeedParserDict):
             return data
 
-        if hasattr(data, "id") and data.id.startswith("http"):  # type: ignore
-            url = data.id
-        else:
-            url = data.get("link")
-
         download_url = None
-        if hasattr(data, "links"):
-            for link in data.links:
-                if link.get("type") in ["application/x-bittorrent"]:
-                    download_url = link.href if hasattr(link, "href") else None
+        links = data.get("links")
+        if links is not None:
+            for link in links:
+                if link.get("type") == "application/x-bittorrent":
+                    download_url = link.get("href")
                     break
 
             else:
                 download_url = data.get("link")
 
-        # 发布时间提取
-        published_time = (
-            datetime.fromtimestamp(time.mktime(data.published_parsed))  # type: ignore
-            if hasattr(data, "published_parsed")
-            else datetime.now()
-        )
-
-        return {
-            "title": data.get("title", "No Title"),
-            "url": url,
-            "download_url": download_url,
-            "published_time": published_time,
-        }
+        return _entry_fields(data, download_url)
 
 
 class MikanEntry(TorrentEntryMixin, ParsedItem):
@@ -240,31 +255,13 @@ class DefaultEntry(ParsedItem):
         if not isinstance(data, FeedParserDict):
             return data
 
-        if hasattr(data, "id") and data.id.startswith("http"):  # type: ignore
-            url = data.id
-        else:
-            url = data.get("link")
-
         download_url = data.get("link")
-        if hasattr(data, "links"):
-            for link in data.links:
-                if link.rel == "enclosure":
-                    download_url = link.href if hasattr(link, "href") else None
-                    break
+        for link in data.get("links", ()):
+            if link.get("rel") == "enclosure":
+                download_url = link.get("href")
+                break
 
-        # 发布时间提取
-        published_time = (
-            datetime.fromtimestamp(time.mktime(data.published_parsed))  # type: ignore
-            if hasattr(data, "published_parsed")
-            else datetime.now()
-        )
-
-        return {
-            "title": data.get("title", "No Title"),
-            "url": url,
-            "download_url": download_url,
-            "published_time": published_time,
-        }
+        return _entry_fields(data, download_url)
 
 
 ENTRY_PARSER_MAP = {
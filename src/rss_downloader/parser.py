@@ -1,25 +1,27 @@
+import hashlib
 import re
-from functools import lru_cache
+from collections.abc import Sequence
+from typing import NamedTuple
 
+import anyio
 import feedparser
 import httpx
 from pydantic import HttpUrl, ValidationError
 
 from .config import ConfigManager
+from .database import Database
 from .logger import LoggerProtocol
 from .models import ENTRY_PARSER_MAP, ParsedItem
 
 
-@lru_cache(maxsize=32)
-def _compile_patterns(
-    feed_name: str,
-    config_version: int,
-    patterns: tuple[str, ...],
-    logger: LoggerProtocol,
-) -> list[re.Pattern]:
-    """获取并编译指定RSS源的过滤规则"""
-    logger.debug(f"编译过滤规则: {feed_name} (version {config_version})")
-    return [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+class FeedCacheEntry(NamedTuple):
+    """RSS源的条件请求信息，条目全部处理完成后才保存"""
+
+    feed_name: str
+    config_hash: str
+    etag: str | None
+    last_modified: str | None
+    body_hash: str
 
 
 class RSSParser:
@@ -28,37 +30,38 @@ class RSSParser:
         config: ConfigManager,
         logger: LoggerProtocol,
         http_client: httpx.AsyncClient,
+        db: Database | None = None,
     ):
         self.config = config
         self.logger = logger
         self.http_client = http_client
+        self.db = db  # 用于读取条件请求信息，未提供时每次都完整获取
 
     def match_filters(self, title: str, feed_name: str) -> bool:
         """检查标题是否匹配指定源的过滤规则"""
-        # 获取当前配置版本以确保缓存正确
-        current_version = self.config.get_config_version()
-        include_patterns, exclude_patterns = self.config.get_feed_patterns(feed_name)
-        include_compiled = _compile_patterns(
-            feed_name, current_version, tuple(include_patterns), self.logger
-        )
-        exclude_compiled = _compile_patterns(
-            feed_name, current_version, tuple(exclude_patterns), self.logger
+        return self._match_compiled(
+            title, *self.config.get_compiled_feed_patterns(feed_name)
         )
 
-        if not include_compiled:
-            is_included = True
-        else:
-            is_included = any(pattern.search(title) for pattern in include_compiled)
-
+    @staticmethod
+    def _match_compiled(
+        title: str,
+        include_compiled: Sequence[re.Pattern[str]],
+        exclude_compiled: Sequence[re.Pattern[str]],
+    ) -> bool:
+        """使用已编译的规则检查标题"""
+        # 规则已合并为单个正则，先检查排除规则，命中即可跳过包含规则的匹配
         if any(pattern.search(title) for pattern in exclude_compiled):
             return False
 
-        return is_included
+        return not include_compiled or any(
+            pattern.search(title) for pattern in include_compiled
+        )
 
     async def parse_feed(
         self, feed_name: str, feed_url: HttpUrl
-    ) -> tuple[int, list[ParsedItem]]:
-        """异步解析RSS源并返回总数和匹配的条目"""
+    ) -> tuple[int, list[ParsedItem], FeedCacheEntry | None]:
+        """异步解析RSS源并返回总数、匹配的条目和待保存的条件请求信息"""
         matched_items: list[ParsedItem] = []
 
         feed_config = self.config.get_feed_by_name(feed_name)
@@ -66,20 +69,52 @@ class RSSParser:
         ParserModel = ENTRY_PARSER_MAP.get(extractor_type, ENTRY_PARSER_MAP["default"])
 
         self.logger.info(f"开始获取 RSS 源: {feed_name}")
+        # 缓存按源名称保存，并绑定地址、过滤规则、下载器等配置，规则变化后重新匹配全部条目
+        config_hash = (
+            hashlib.blake2b(
+                feed_config.model_dump_json().encode(), digest_size=16
+            ).hexdigest()
+            if feed_config
+            else None
+        )
+        cache = (
+            await self.db.get_feed_cache(feed_name, config_hash)
+            if self.db and config_hash
+            else None
+        )
+        headers = {}
+        if cache:
+            etag, last_modified, _ = cache
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
         try:
             response = await self.http_client.get(
                 str(feed_url),
+                headers=headers,
                 follow_redirects=True,
                 timeout=30,
             )
+            if response.status_code == 304:
+                self.logger.info(f"{feed_name}: RSS 源未更新，跳过解析")
+                return 0, [], None
             response.raise_for_status()
-            feed_content = response.text
         except Exception as e:
             self.logger.error(f"获取 RSS 源时发生网络错误 ({feed_name}): {e}")
-            return 0, []
+            return 0, [], None
+
+        # 部分服务端不支持条件请求，内容未变化时同样跳过解析
+        body_hash = hashlib.blake2b(response.content, digest_size=16).hexdigest()
+        if cache and cache[2] == body_hash:
+            self.logger.info(f"{feed_name}: RSS 源内容未变化，跳过解析")
+            return 0, [], None
 
         self.logger.info(f"开始解析 RSS 源: {feed_name}")
-        feed = feedparser.parse(feed_content)
+        # feedparser 为纯 CPU 解析，放入工作线程避免阻塞其他源的网络请求
+        # 传入原始字节，由 feedparser 按 XML 声明自行识别编码
+        feed = await anyio.to_thread.run_sync(feedparser.parse, response.content)
 
         if feed.bozo:
             self.logger.error(
@@ -87,29 +122,47 @@ class RSSParser:
             )
             if hasattr(feed, "debug_message"):
                 self.logger.error(f"Debug 信息: {feed.debug_message}")
-            return 0, []
+            return 0, [], None
 
         # 检查是否成功获取到feed
         if not feed.entries and not getattr(feed, "feed", None):
             self.logger.error(f"Feed 为空或无法访问 ({feed_url})")
-            return 0, []
+            return 0, [], None
 
         self.logger.info(f"{feed_name}: 获取到 {len(feed.entries)} 个条目")
 
+        # 整个源使用同一组规则，只需获取一次
+        include_compiled, exclude_compiled = self.config.get_compiled_feed_patterns(
+            feed_name
+        )
         for entry in feed.entries:
+            # 先按标题过滤，未匹配的条目无需解析链接和时间
+            title = entry.get("title", "No Title")
+            if not self._match_compiled(title, include_compiled, exclude_compiled):
+                self.logger.warning(f"匹配失败({feed_name}): {title}")
+                continue
+
             try:
                 # 调用 MikanEntry 等模型解析和验证
                 parsed_item = ParserModel.model_validate(entry)
-
-                if self.match_filters(parsed_item.title, feed_name):
-                    matched_items.append(parsed_item)
-                    self.logger.info(f"匹配成功({feed_name}): {parsed_item.title}")
-                else:
-                    self.logger.warning(f"匹配失败({feed_name}): {parsed_item.title}")
+                matched_items.append(parsed_item)
+                self.logger.info(f"匹配成功({feed_name}): {parsed_item.title}")
 
             except ValidationError as entry_error:
                 self.logger.error(f"处理条目时发生错误({feed_name}): {entry_error}")
                 continue
 
         self.logger.info(f"{feed_name}: 匹配到 {len(matched_items)} 个条目")
-        return len(feed.entries), matched_items
+        # 由调用方在条目全部提交并写入数据库后保存，避免失败后下次运行跳过这些条目
+        feed_cache = (
+            FeedCacheEntry(
+                feed_name,
+                config_hash,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                body_hash,
+            )
+            if config_hash
+            else None
+        )
+        return len(feed.entries), matched_items, feed_cache
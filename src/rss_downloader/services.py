@@ -1,6 +1,7 @@
 import anyio
 import httpx
 
+from . import __version__
 from .config import DATABASE_FILE_NAME, ConfigManager
 from .database import Database
 from .downloaders import Aria2Client, QBittorrentClient, TransmissionClient
@@ -53,8 +54,11 @@ class AppServices:
         db = await Database.create(db_path=db_path, logger=logger)
 
         # 初始化 RSS 解析器
-        http_client = httpx.AsyncClient()
-        parser = RSSParser(config=config, logger=logger, http_client=http_client)
+        # httpx 默认请求 gzip/deflate 压缩并自动解压，这里只需声明客户端标识
+        http_client = httpx.AsyncClient(
+            headers={"User-Agent": f"rss-downloader/{__version__}"}
+        )
+        parser = RSSParser(config=config, logger=logger, http_client=http_client, db=db)
 
         # 初始化 Webhook 服务
         webhook_service = WebhookService(
@@ -159,6 +163,7 @@ class AppServices:
         """关闭所有需要关闭的服务"""
         async with anyio.create_task_group() as tg:
             tg.start_soon(self._http_client.aclose)
+            tg.start_soon(self.db.close)
             for client in self.download_clients:
                 tg.start_soon(client.aclose)
 
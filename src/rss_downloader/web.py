@@ -1,9 +1,13 @@
+import base64
+import binascii
+import hashlib
+import json
 from datetime import datetime, time
 from pathlib import Path
 from typing import Annotated
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel, ValidationError, model_validator
 
@@ -14,6 +18,7 @@ from .models import (
     Config,
     ConfigUpdatePayload,
     Downloader,
+    DownloadRecord,
     QBittorrentConfig,
     TransmissionConfig,
 )
@@ -22,6 +27,15 @@ from .services import AppServices
 router = APIRouter()
 
 templates = Jinja2Templates(directory=str(Path(__file__).parent / "templates"))
+# 模板随包发布，运行期间不会变化，关闭每次渲染前的文件修改检查
+templates.env.auto_reload = False
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# 配置页面只依赖访问地址（静态资源链接为绝对地址），按 base_url 缓存渲染结果
+CONFIG_PAGE_CACHE_SIZE = 8
+# 管理页面不进入共享缓存；浏览器每次用 ETag 重新验证，升级后立即获取新页面
+CONFIG_PAGE_CACHE_CONTROL = "private, no-cache"
 
 
 def format_datetime(dt: datetime | None, fmt: str | None = None) -> str:
@@ -29,13 +43,43 @@ def format_datetime(dt: datetime | None, fmt: str | None = None) -> str:
     if dt is None:
         return ""
     if fmt is None:
-        fmt = "%Y-%m-%d %H:%M:%S"
+        if dt.tzinfo is None:
+            # 与 DATETIME_FORMAT 输出一致，但比 strftime 快数倍
+            return dt.isoformat(" ", "seconds")
+        fmt = DATETIME_FORMAT
     return dt.strftime(fmt)
 
 
 templates.env.filters["strftime"] = format_datetime
 
 
+def encode_cursor(record: DownloadRecord) -> str:
+    """将记录的排序键编码为翻页游标"""
+    key = [
+        record.download_time.isoformat(),
+        record.feed_name,
+        record.published_time.isoformat(),
+        record.id,
+    ]
+    return base64.urlsafe_b64encode(json.dumps(key).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str, datetime, int] | None:
+    """解析翻页游标，格式错误时返回 None"""
+    try:
+        download_time, feed_name, published_time, last_id = json.loads(
+            base64.urlsafe_b64decode(cursor)
+        )
+        return (
+            datetime.fromisoformat(download_time),
+            str(feed_name),
+            datetime.fromisoformat(published_time),
+            int(last_id),
+        )
+    except (binascii.Error, TypeError, ValueError):
+        return None
+
+
 def get_services(request: Request) -> AppServices:
     """从 app.state 中获取 AppServices 容器"""
     return request.app.state.services
@@ -46,6 +90,9 @@ class SearchFilters(BaseModel):
 
     page: Annotated[int, Query(description="页码", ge=1)] = 1
     limit: Annotated[int, Query(description="每页数量", ge=1, le=100)] = 20
+    cursor: Annotated[
+        str | None, Query(description="翻页游标，即上一页最后一条记录")
+    ] = None
     title: Annotated[str | None, Query(description="标题关键词")] = None
     feed_name: Annotated[str | None, Query(description="RSS源名称")] = None
     downloader: Annotated[
@@ -73,23 +120,22 @@ class SearchFilters(BaseModel):
     @model_validator(mode="after")
     def fix_date_ranges(self) -> "SearchFilters":
         """动修正不合理的日期范围，并将结束日期调整为当天末尾"""
-        if (
+        # 大多数请求不带时间筛选，直接返回
+        if not (
             self.published_start_time
-            and self.published_end_time
-            and self.published_start_time > self.published_end_time
+            or self.published_end_time
+            or self.download_start_time
+            or self.download_end_time
         ):
-            self.published_start_time, self.published_end_time = (
-                self.published_end_time,
-                self.published_start_time,
+            return self
+
+        if self.published_start_time and self.published_end_time:
+            self.published_start_time, self.published_end_time = sorted(
+                (self.published_start_time, self.published_end_time)
             )
-        if (
-            self.download_start_time
-            and self.download_end_time
-            and self.download_start_time > self.download_end_time
-        ):
-            self.download_start_time, self.download_end_time = (
-                self.download_end_time,
-                self.download_start_time,
+        if self.download_start_time and self.download_end_time:
+            self.download_start_time, self.download_end_time = sorted(
+                (self.download_start_time, self.download_end_time)
             )
         if self.published_end_time:
             self.published_end_time = datetime.combine(
@@ -109,6 +155,20 @@ class RedownloadRequest(BaseModel):
     downloader: Downloader
 
 
+class StatusResponse(BaseModel):
+    """操作结果的响应模型"""
+
+    status: str
+    message: str
+
+
+class VersionResponse(BaseModel):
+    """下载器连接测试的响应模型"""
+
+    status: str
+    version: str
+
+
 @router.get("/", response_class=HTMLResponse)
 async def index(
     request: Request,
@@ -117,14 +177,20 @@ async def index(
 ):
     """主页，展示下载记录"""
     offset = (filters.page - 1) * filters.limit
+    # 下一页链接携带游标，按键集分页查询，无需扫描并跳过前面的记录
+    after = (
+        decode_cursor(filters.cursor) if filters.cursor and filters.page > 1 else None
+    )
 
     downloads, total = await services.db.search_downloads(
-        **filters.model_dump(exclude={"page", "limit"}),
+        **filters.model_dump(exclude={"page", "limit", "cursor"}),
         limit=filters.limit,
         offset=offset,
+        after=after,
     )
 
     total_pages = (total + filters.limit - 1) // filters.limit
+    next_cursor = encode_cursor(downloads[-1]) if downloads else None
 
     return templates.TemplateResponse(
         request,
@@ -136,6 +202,7 @@ async def index(
             "offset": offset,
             "total": total,
             "total_pages": total_pages,
+            "next_cursor": next_cursor,
             "query": filters,
         },
     )
@@ -145,13 +212,13 @@ async def index(
 async def redownload_item(
     payload: RedownloadRequest,
     services: Annotated[AppServices, Depends(get_services)],
-):
+) -> StatusResponse:
     """API: 重新下载一个任务"""
     try:
         await services.rss_downloader.redownload(
             id=payload.id, downloader=payload.downloader
         )
-        return {"status": "success", "message": "任务已成功发送到下载器"}
+        return StatusResponse(status="success", message="任务已成功发送到下载器")
     except ItemNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
     except ValueError as e:
@@ -168,19 +235,20 @@ async def redownload_item(
 @router.get("/config", response_model=Config)
 async def get_config(services: Annotated[AppServices, Depends(get_services)]):
     """API：获取配置"""
-    return services.config.get()
+    # 配置已是校验过的 Config，直接返回缓存的序列化结果，跳过 response_model 的重复校验
+    return Response(services.config.get_json(), media_type="application/json")
 
 
 @router.put("/config")
 async def update_config(
     payload: ConfigUpdatePayload,
     services: Annotated[AppServices, Depends(get_services)],
-):
+) -> StatusResponse:
     """API：更新配置"""
     try:
         update_data = payload.model_dump(exclude_unset=True)
         await services.config.update(update_data)
-        return {"status": "ok", "message": "配置已成功保存！"}
+        return StatusResponse(status="ok", message="配置已成功保存！")
     except ValidationError as e:
         services.logger.error(f"配置验证失败: {e.errors()}")
         raise HTTPException(status_code=422, detail=e.errors()) from e
@@ -192,15 +260,32 @@ async def update_config(
 @router.get("/config-page", response_class=HTMLResponse)
 async def config_page(request: Request):
     """配置页面"""
-    return templates.TemplateResponse(request, "config.html", {"request": request})
+    cache: dict[str, tuple[bytes, str]] = request.app.state.config_page_cache
+    key = str(request.base_url)
+    cached = cache.get(key)
+    if cached is None:
+        content = templates.get_template("config.html").render(request=request).encode()
+        etag = f'"{hashlib.blake2b(content, digest_size=16).hexdigest()}"'
+        cached = (content, etag)
+        # 限制缓存条目数，避免任意 Host 请求头撑大缓存
+        if len(cache) < CONFIG_PAGE_CACHE_SIZE:
+            cache[key] = cached
+
+    content, etag = cached
+    headers = {"Cache-Control": CONFIG_PAGE_CACHE_CONTROL, "ETag": etag}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return HTMLResponse(content, headers=headers)
 
 
 @router.post("/test-downloader/aria2")
 async def test_aria2_connection(
     data: Aria2Config,
     services: Annotated[AppServices, Depends(get_services)],
-):
+) -> VersionResponse:
     """测试 Aria2 连接"""
+    client = None
     try:
         client = await Aria2Client.create(
             logger=services.logger,
@@ -211,23 +296,27 @@ async def test_aria2_connection(
         if "error" in result:
             raise ValueError(result["error"]["message"])
         services.logger.success("测试 Aria2 连接成功")
-        return {
-            "status": "success",
-            "version": result.get("result", {}).get("version", "未知"),
-        }
+        return VersionResponse(
+            status="success",
+            version=result.get("result", {}).get("version", "未知"),
+        )
     except (ValidationError, ValueError) as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         services.logger.error("测试 Aria2 连接失败")
         raise HTTPException(status_code=500, detail=f"连接失败: {e}") from e
+    finally:
+        if client:
+            await client.aclose()
 
 
 @router.post("/test-downloader/qbittorrent")
 async def test_qbittorrent_connection(
     data: QBittorrentConfig,
     services: Annotated[AppServices, Depends(get_services)],
-):
+) -> VersionResponse:
     """测试 qBittorrent 连接"""
+    client = None
     try:
         client = await QBittorrentClient.create(
             logger=services.logger,
@@ -237,19 +326,23 @@ async def test_qbittorrent_connection(
         )
         result = await client.get_version()
         services.logger.success("测试 qBittorrent 连接成功")
-        return {"status": "success", "version": result["version"]}
+        return VersionResponse(status="success", version=result["version"])
     except (ValidationError, ValueError) as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         services.logger.error("测试 qBittorrent 连接失败")
         raise HTTPException(status_code=500, detail=f"连接失败: {e}") from e
+    finally:
+        if client:
+            await client.aclose()
 
 
 @router.post("/test-downloader/transmission")
 async def test_transmission_connection(
     data: TransmissionConfig,
     services: Annotated[AppServices, Depends(get_services)],
-):
+) -> VersionResponse:
+    client = None
     try:
         client = await TransmissionClient.create(
             logger=services.logger,
@@ -259,9 +352,12 @@ async def test_transmission_connection(
         )
         result = await client.get_version()
         services.logger.success("测试 Transmission 连接成功")
-        return {"status": "success", "version": result["version"]}
+        return VersionResponse(status="success", version=result["version"])
     except (ValidationError, ValueError) as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
         services.logger.error("测试 Transmission 连接失败")
         raise HTTPException(status_code=500, detail=f"连接失败: {e}") from e
+    finally:
+        if client:
+            await client.aclose()
@@ -1,8 +1,11 @@
+from typing import Any
+
+import anyio
 import httpx
 
 from .config import ConfigManager
 from .logger import LoggerProtocol
-from .models import DownloadRecord
+from .models import DownloadRecord, WebhookConfig
 
 
 class WebhookService:
@@ -18,7 +21,7 @@ class WebhookService:
 
     async def send(self, record: DownloadRecord):
         """发送下载结果通知到启用的 Webhook"""
-        webhooks = self.config.webhooks
+        webhooks = [hook for hook in self.config.webhooks if hook.enabled]
         if not webhooks:
             return
 
@@ -58,13 +61,18 @@ class WebhookService:
             ],
         }
 
-        for hook in webhooks:
-            if hook.enabled:
-                try:
-                    response = await self.http_client.post(
-                        str(hook.url), json=payload, timeout=10
-                    )
-                    response.raise_for_status()
-                    self.logger.info(f"Webhook 通知发送成功 - {hook.name}")
-                except Exception as e:
-                    self.logger.error(f"Webhook 通知发送失败 - {hook.name}: {e}")
+        # 各 Webhook 相互独立，并发发送，总耗时取决于最慢的一个
+        async with anyio.create_task_group() as tg:
+            for hook in webhooks:
+                tg.start_soon(self._post, hook, payload)
+
+    async def _post(self, hook: WebhookConfig, payload: dict[str, Any]):
+        """向单个 Webhook 发送通知，失败只记录日志"""
+        try:
+            response = await self.http_client.post(
+                str(hook.url), json=payload, timeout=10
+            )
+            response.raise_for_status()
+            self.logger.info(f"Webhook 通知发送成功 - {hook.name}")
+        except Exception as e:
+            self.logger.error(f"Webhook 通知发送失败 - {hook.name}: {e}")
@@ -1,7 +1,9 @@
-from collections.abc import AsyncIterator
+import shutil
+from collections.abc import AsyncIterator, Iterator
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock
 
+import anyio
 import pytest
 from anyio import Path as AnyioPath
 from httpx import ASGITransport, AsyncClient
@@ -9,7 +11,7 @@ from httpx import ASGITransport, AsyncClient
 from rss_downloader.app import create_app
 from rss_downloader.config import ConfigManager
 from rss_downloader.database import Database
-from rss_downloader.logger import LoggerProtocol
+from rss_downloader.logger import DummyLogger, LoggerProtocol
 from rss_downloader.main import RSSDownloader
 from rss_downloader.models import Config
 from rss_downloader.services import AppServices
@@ -22,6 +24,15 @@ def anyio_backend():
     return "asyncio"
 
 
+@pytest.fixture(scope="session")
+def http_client() -> Iterator[AsyncClient]:
+    """整个测试会话共用的 HTTP 客户端，请求均由 respx 模拟"""
+    # 每次创建客户端都要加载 CA 证书，会话内只创建一次
+    client = AsyncClient()
+    yield client
+    anyio.run(client.aclose)
+
+
 @pytest.fixture
 def mock_logger() -> LoggerProtocol:
     """创建一个功能完整的模拟 logger 对象。"""
@@ -65,15 +76,31 @@ async def test_config(
     return cfg_manager
 
 
+@pytest.fixture(scope="session")
+def db_template(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """只建一次表结构的数据库模板文件。"""
+    template = tmp_path_factory.mktemp("db") / "template.db"
+
+    async def create_template():
+        db = await Database.create(AnyioPath(template), logger=DummyLogger())
+        await db.close()
+
+    anyio.run(create_template)
+    return template
+
+
 @pytest.fixture
 async def test_db(
-    tmp_path: Path, mock_logger: LoggerProtocol
+    tmp_path: Path, db_template: Path, mock_logger: LoggerProtocol
 ) -> AsyncIterator[Database]:
     """创建一个使用临时的数据库实例。"""
-    db_path = AnyioPath(tmp_path / "test.db")
-    db = await Database.create(db_path=db_path, logger=mock_logger)
+    # 复制已建好表结构的模板，无需每个测试重新执行建表语句
+    db_path = tmp_path / "test.db"
+    shutil.copyfile(db_template, db_path)
+    db = Database(db_path=AnyioPath(db_path), logger=mock_logger)
     yield db
     await db.reset()
+    await db.close()
 
 
 @pytest.fixture
@@ -84,6 +111,9 @@ def mock_services(mock_logger: LoggerProtocol) -> AppServices:
     # 为 ConfigManager 创建一个更精确的 mock
     mock_config = MagicMock(spec=ConfigManager)
     mock_config.get = MagicMock(return_value=Config.model_validate({}))
+    mock_config.get_json = MagicMock(
+        return_value=Config.model_validate({}).model_dump_json()
+    )
     mock_config.update = AsyncMock()
     services.config = mock_config
 
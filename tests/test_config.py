@@ -1,9 +1,20 @@
+import os
+import re
+from unittest.mock import AsyncMock
+
 import anyio
 import pytest
 import yaml
 from pydantic import ValidationError
 
-from rss_downloader.config import CONFIG_FILE, ConfigManager
+from rss_downloader import _wait_next_run
+from rss_downloader.config import (
+    CONFIG_FILE,
+    ConfigManager,
+    _combine_patterns,
+    _deep_merge,
+    _deep_merge_tracking,
+)
 from rss_downloader.models import Config
 
 pytestmark = pytest.mark.anyio
@@ -22,6 +33,27 @@ async def test_find_config_path_fallback(monkeypatch, tmp_path: anyio.Path):
     assert found_path == expected_path
 
 
+def test_deep_merge():
+    """测试嵌套配置合并，且不修改默认配置"""
+    default = {"web": {"host": "127.0.0.1", "port": 8000}, "log": {"level": "INFO"}}
+    user = {"web": {"port": 8080}, "feeds": [{"name": "A"}]}
+
+    merged = _deep_merge(default, user)
+
+    assert merged == {
+        "web": {"host": "127.0.0.1", "port": 8080},
+        "log": {"level": "INFO"},
+        "feeds": [{"name": "A"}],
+    }
+    assert default["web"]["port"] == 8000
+
+    # 记录是否补齐了缺失字段
+    assert _deep_merge_tracking(default, user)[1] is True
+    complete = {"web": {"host": "0.0.0.0", "port": 1}, "log": {"level": "DEBUG"}}
+    assert _deep_merge_tracking(default, complete)[1] is False
+    assert _deep_merge_tracking(default, complete | {"web": {"port": 1}})[1] is True
+
+
 async def test_config_creation(tmp_config_file: anyio.Path):
     """测试 _load_or_create 方法的文件创建行为"""
     assert not await tmp_config_file.exists()
@@ -39,6 +71,18 @@ async def test_config_creation(tmp_config_file: anyio.Path):
     assert data == default_config
 
 
+async def test_load_or_create_keeps_complete_file(tmp_config_file: anyio.Path):
+    """测试配置文件已包含全部字段时不会被回写"""
+    default_config = Config.model_validate({}).model_dump(mode="json")
+    content = "# 用户注释\n" + yaml.safe_dump(default_config, allow_unicode=True)
+    await tmp_config_file.write_text(content)
+
+    _, loaded = await ConfigManager._load_or_create(tmp_config_file)
+
+    assert await tmp_config_file.read_text() == content
+    assert loaded == content.encode()
+
+
 async def test_config_update_and_reload(test_config: ConfigManager):
     """测试配置更新和热重载"""
     initial_version = test_config.get_config_version()
@@ -58,17 +102,58 @@ async def test_config_update_and_reload(test_config: ConfigManager):
         async with await test_config.config_path.open("w") as f:
             await f.write(yaml.safe_dump({"log": {"level": "CRITICAL"}}))
 
-        # 等待足够的时间让 watcher (内部 sleep 5s) 检测到变化
-        await anyio.sleep(5.5)
+        # 轮询等待文件事件经过去抖 (200ms) 后触发重载，而不是固定等待
+        with anyio.fail_after(5):
+            while test_config.get().log.level != "CRITICAL":
+                await anyio.sleep(0.02)
 
         # 验证配置是否已更新
-        assert test_config.get().log.level == "CRITICAL"
         assert test_config.get_config_version() > initial_version
 
         # 清理后台任务，以便测试可以结束
         tg.cancel_scope.cancel()
 
 
+async def test_reload_skips_unchanged_content(test_config: ConfigManager):
+    """测试文件仅修改时间变化而内容不变时不会重新加载"""
+    initial_version = test_config.get_config_version()
+    content = await test_config.config_path.read_bytes()
+
+    # 内容相同，仅更新时间
+    await test_config.config_path.write_bytes(content)
+    stat_result = await test_config.config_path.stat()
+    os.utime(
+        test_config.config_path,
+        (stat_result.st_atime, stat_result.st_mtime + 10),
+    )
+    await test_config._reload_if_changed()
+    assert test_config.get_config_version() == initial_version
+
+    # 内容发生变化
+    await test_config.config_path.write_text(
+        yaml.safe_dump({"log": {"level": "ERROR"}})
+    )
+    await test_config._reload_if_changed()
+    assert test_config.get_config_version() == initial_version + 1
+    assert test_config.get().log.level == "ERROR"
+
+
+async def test_reload_waits_for_update_write(test_config: ConfigManager):
+    """测试热重载不会读到 update() 写入过程中被截断的文件"""
+    await test_config.update({"log": {"level": "WARNING"}})
+    content = await test_config.config_path.read_bytes()
+
+    async with anyio.create_task_group() as tg:
+        async with test_config._lock:
+            # 模拟 update() 持锁写入时文件已被截断
+            await test_config.config_path.write_bytes(b"")
+            tg.start_soon(test_config._reload_if_changed)
+            await anyio.sleep(0.05)
+            await test_config.config_path.write_bytes(content)
+
+    assert test_config.get().log.level == "WARNING"
+
+
 async def test_update_failure_rollback(test_config: ConfigManager):
     """测试更新失败时的回滚"""
     await test_config.update({"log": {"level": "CRITICAL"}})
@@ -80,6 +165,55 @@ async def test_update_failure_rollback(test_config: ConfigManager):
     assert test_config.get().log.level == "CRITICAL"
 
 
+async def test_update_write_failure_keeps_config(
+    test_config: ConfigManager, monkeypatch
+):
+    """测试写入配置文件失败时，内存中的配置及其缓存保持不变"""
+    await test_config.update({"log": {"level": "CRITICAL"}})
+    config_before = test_config.get()
+    dump_before = test_config._config_dump
+
+    monkeypatch.setattr(
+        anyio.Path, "open", AsyncMock(side_effect=OSError("模拟磁盘写入失败"))
+    )
+    with pytest.raises(OSError):
+        await test_config.update({"log": {"level": "DEBUG"}})
+
+    assert test_config.get() is config_before
+    assert test_config._config_dump == dump_before
+    assert test_config.get().log.level == "CRITICAL"
+
+
+async def test_update_after_reload_merges_reloaded_config(
+    test_config: ConfigManager,
+):
+    """测试热重载后 update() 基于重载后的配置合并，而不是旧缓存"""
+    await test_config.config_path.write_text(
+        yaml.safe_dump({"log": {"level": "ERROR"}, "web": {"port": 8001}})
+    )
+    await test_config._reload_if_changed()
+    assert test_config.get().log.level == "ERROR"
+
+    await test_config.update({"web": {"port": 9000}})
+
+    assert test_config.get().log.level == "ERROR"
+    assert test_config.get().web.port == 9000
+    assert test_config._config_dump == test_config.get().model_dump(mode="json")
+    saved = yaml.safe_load(await test_config.config_path.read_text())
+    assert saved["log"]["level"] == "ERROR"
+
+
+async def test_get_json_cached_until_config_changes(test_config: ConfigManager):
+    """测试配置 JSON 在配置替换前复用缓存，更新后重新序列化"""
+    first = test_config.get_json()
+    assert test_config.get_json() is first
+    assert first == test_config.get().model_dump_json()
+
+    await test_config.update({"log": {"level": "DEBUG"}})
+    assert test_config.get_json() is not first
+    assert '"level":"DEBUG"' in test_config.get_json()
+
+
 async def test_config_properties_access(test_config: ConfigManager):
     """测试 ConfigManager 的各个属性访问器"""
     await test_config.update(
@@ -130,3 +264,74 @@ async def test_config_get_feed_methods_found(test_config: ConfigManager):
     assert exclude == ["720p"]
 
     assert test_config.get_feed_downloader("MyTestFeed") == "qbittorrent"
+
+
+async def test_get_compiled_feed_patterns(test_config: ConfigManager):
+    """测试过滤规则只编译一次，并在规则变化后使用新的编译结果"""
+    feed = {"name": "F", "url": "http://f.com/rss", "include": ["1080p"]}
+    await test_config.update({"aria2": {"rpc": "http://localhost/"}, "feeds": [feed]})
+
+    include, exclude = test_config.get_compiled_feed_patterns("F")
+    assert [p.pattern for p in include] == ["1080p"]
+    assert include[0].flags & re.IGNORECASE
+    assert exclude == ()
+    assert test_config.get_compiled_feed_patterns("F") == (include, exclude)
+    assert test_config.get_compiled_feed_patterns("F")[0][0] is include[0]
+
+    await test_config.update({"feeds": [feed | {"exclude": ["720p"]}]})
+    _, exclude = test_config.get_compiled_feed_patterns("F")
+    assert [p.pattern for p in exclude] == ["720p"]
+
+    # 热重载后缓存失效
+    await test_config.config_path.write_text(
+        yaml.safe_dump({"aria2": {"rpc": "http://localhost/"}, "feeds": [feed]})
+    )
+    await test_config._reload_if_changed()
+    assert test_config.get_compiled_feed_patterns("F")[1] == ()
+
+
+def test_combine_patterns():
+    """测试多条规则合并为一个正则，无法安全合并时回退为逐条编译"""
+    (combined,) = _combine_patterns(("1080P", "CHS"))
+    assert combined.search("[1080p]") and combined.search("[chs]")
+    assert not combined.search("[720p]")
+
+    # 反向引用、条件分组引用、内联全局标志、重复命名分组均不能合并
+    assert len(_combine_patterns((r"(\d)\1", "x"))) == 2
+    assert len(_combine_patterns(("(?P<n>a)?(?(n)y|z)", "x"))) == 2
+    conditional = _combine_patterns(("(a)?b", "(x)?(?(1)y|z)"))
+    assert len(conditional) == 2
+    assert any(p.search("xy") for p in conditional)
+    assert len(_combine_patterns(("(?i)x", "y"))) == 2
+    assert len(_combine_patterns(("(?P<n>a)", "(?P<n>b)"))) == 2
+    assert _combine_patterns(()) == ()
+
+
+async def test_wait_next_run_follows_interval_change(test_config: ConfigManager):
+    """测试热重载修改检查间隔后，定时任务按新的间隔提前唤醒"""
+    assert test_config.web.interval_hours == 6
+    started = anyio.current_time() - 3600  # 上次运行于 1 小时前
+    woke_at = reloaded_at = None
+
+    async def wait_and_record():
+        nonlocal woke_at
+        await _wait_next_run(test_config, started)
+        woke_at = anyio.current_time()
+
+    # _wait_next_run 返回后任务组才会退出
+    with anyio.fail_after(2):
+        async with anyio.create_task_group() as tg:
+            tg.start_soon(wait_and_record)
+            await anyio.sleep(0.05)
+            assert woke_at is None  # 原间隔 6 小时，尚未到期
+
+            await test_config.config_path.write_text(
+                yaml.safe_dump({"web": {"interval_hours": 1}})
+            )
+            reloaded_at = anyio.current_time()
+            await test_config._reload_if_changed()
+
+    # 由热重载唤醒，新间隔已到期，而非等到原定的 6 小时后
+    assert woke_at is not None
+    assert reloaded_at is not None and reloaded_at <= woke_at
+    assert woke_at - reloaded_at < 1
@@ -10,6 +10,41 @@ from rss_downloader.models import DownloadRecord
 pytestmark = pytest.mark.anyio
 
 
+async def test_db_init_creates_indexes(test_db: Database):
+    """测试初始化数据库时创建索引并启用 WAL"""
+    async with test_db._connection() as conn:
+        async with conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'downloads'"
+        ) as cursor:
+            indexes = {row[0] for row in await cursor.fetchall()}
+        async with conn.execute("PRAGMA journal_mode") as cursor:
+            journal_mode = (await cursor.fetchone())[0]
+
+    assert {
+        "idx_downloads_download_time",
+        "idx_downloads_status_url",
+        "idx_downloads_published_time",
+    } <= indexes
+    assert journal_mode == "wal"
+
+
+async def test_db_connection_reuse(test_db: Database):
+    """测试连接被复用，关闭后可重新连接"""
+    async with test_db._connection() as conn1:
+        pass
+    async with test_db._connection() as conn2:
+        pass
+    assert conn1 is conn2
+
+    await test_db.close()
+    assert test_db._conn is None
+
+    async with test_db._connection() as conn3:
+        pass
+    assert conn3 is not conn1
+    assert not await test_db.is_downloaded("http://example.com/none.torrent")
+
+
 async def test_db_insert_and_is_downloaded(test_db: Database):
     """测试插入记录和检查是否已下载的功能"""
     assert not await test_db.is_downloaded("http://example.com/item1.torrent")
@@ -162,3 +197,102 @@ async def test_db_search(test_db: Database):
     )
     assert total == 1
     assert results[0].title == "Aria2 Fail Manual"
+
+
+async def test_db_insert_many_and_filter_new(test_db: Database):
+    """测试批量插入记录和批量筛选未下载链接"""
+    now = datetime.now()
+    records = [
+        DownloadRecord(
+            title=f"Batch Item {i}",
+            url=HttpUrl(f"http://example.com/batch/{i}"),
+            download_url=f"http://example.com/batch/{i}.torrent",
+            feed_name="TestFeed",
+            feed_url=HttpUrl("http://example.com/feed.xml"),
+            published_time=now,
+            download_time=now,
+            downloader="aria2",
+            status=1 if i % 2 == 0 else 0,
+            mode=0,
+        )
+        for i in range(4)
+    ]
+    assert await test_db.insert_many(records) == 4
+    assert await test_db.insert_many([]) == 0
+
+    _, total = await test_db.search_downloads()
+    assert total == 4
+
+    urls = [f"http://example.com/batch/{i}.torrent" for i in range(5)]
+    # 超过单条 SQL 的占位符上限时分块查询
+    urls += [f"http://example.com/other/{i}.torrent" for i in range(1000)]
+    new_urls = await test_db.filter_new(urls)
+
+    assert "http://example.com/batch/0.torrent" not in new_urls
+    assert "http://example.com/batch/2.torrent" not in new_urls
+    assert "http://example.com/batch/1.torrent" in new_urls  # 失败记录仍可重试
+    assert len(new_urls) == len(urls) - 2
+
+
+async def test_db_search_cache_invalidated_on_write(test_db: Database):
+    """测试相同条件的搜索命中缓存，写入后缓存失效"""
+    record = DownloadRecord(
+        title="Cached Item",
+        url=HttpUrl("http://example.com/cached"),
+        download_url="http://example.com/cached.torrent",
+        feed_name="TestFeed",
+        feed_url=HttpUrl("http://example.com/feed.xml"),
+        published_time=datetime.now(),
+        download_time=datetime.now(),
+        downloader="aria2",
+        status=1,
+        mode=0,
+    )
+    await test_db.insert(record)
+
+    first, _ = await test_db.search_downloads(feed_name="TestFeed")
+    cached, _ = await test_db.search_downloads(feed_name="TestFeed")
+    assert cached is first
+
+    await test_db.insert_many([record.model_copy(update={"title": "Cached Item 2"})])
+    results, total = await test_db.search_downloads(feed_name="TestFeed")
+    assert total == 2
+    assert {r.title for r in results} == {"Cached Item", "Cached Item 2"}
+
+
+async def test_db_search_keyset_pagination(test_db: Database):
+    """测试按上一页最后一条记录的排序键翻页，结果与 OFFSET 分页一致"""
+    now = datetime.now()
+    records = [
+        DownloadRecord(
+            title=f"Page Item {i}",
+            url=HttpUrl(f"http://example.com/page/{i}"),
+            download_url=f"http://example.com/page/{i}.torrent",
+            feed_name=f"Feed{i % 2}",
+            feed_url=HttpUrl("http://example.com/feed.xml"),
+            published_time=datetime(2024, 1, 1 + i % 3),
+            download_time=now if i < 5 else datetime(2024, 1, 1),  # 含相同排序键
+            downloader="aria2",
+            status=1,
+            mode=0,
+        )
+        for i in range(7)
+    ]
+    await test_db.insert_many(records)
+
+    all_results, total = await test_db.search_downloads(limit=100)
+    assert total == 7
+
+    pages, after = [], None
+    while True:
+        page, page_total = await test_db.search_downloads(limit=3, after=after)
+        assert page_total == 7
+        if not page:
+            break
+        pages.extend(page)
+        last = page[-1]
+        after = (last.download_time, last.feed_name, last.published_time, last.id)
+
+    assert [r.id for r in pages] == [r.id for r in all_results]
+    offset_page, _ = await test_db.search_downloads(limit=3, offset=3)
+    assert [r.id for r in offset_page] == [r.id for r in all_results[3:6]]
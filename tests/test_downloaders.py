@@ -1,32 +1,65 @@
 import json
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
 
+import httpx
 import pytest
 import respx
-from httpx import Request, RequestError, Response
+from httpx import HTTPStatusError, Request, RequestError, Response
 
 from rss_downloader.downloaders import (
     Aria2Client,
     QBittorrentClient,
     TransmissionClient,
+    _ssl_context,
 )
 from rss_downloader.logger import LoggerProtocol
 
-pytestmark = pytest.mark.anyio
+# respx 自带的 respx_mock fixture 按此标记配置，模拟所有 HTTP 请求
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.respx(assert_all_called=False, assert_all_mocked=True),
+]
+
+
+def test_clients_share_ssl_context(mock_logger: LoggerProtocol, monkeypatch):
+    """测试下载器客户端复用同一个 SSL 上下文，CA 证书只加载一次"""
+    create_ssl_context = MagicMock(wraps=httpx.create_ssl_context)
+    monkeypatch.setattr(httpx, "create_ssl_context", create_ssl_context)
+    _ssl_context.cache_clear()
+
+    Aria2Client(logger=mock_logger, rpc_url="http://a2/rpc")
+    QBittorrentClient(logger=mock_logger, host="http://qb")
+    TransmissionClient(logger=mock_logger, host="http://tr")
+
+    create_ssl_context.assert_called_once()
+    _ssl_context.cache_clear()
+
+
+# --- 客户端 fixtures ---
+# 仅测试添加任务时直接构造客户端，跳过已由 create 测试覆盖的连接握手
+@pytest.fixture
+async def aria2_client(mock_logger: LoggerProtocol) -> AsyncIterator[Aria2Client]:
+    client = Aria2Client(
+        logger=mock_logger, rpc_url="http://a2/rpc", secret="s3cr3t", dir="test"
+    )
+    yield client
+    await client.aclose()
 
 
 @pytest.fixture
-def mock_downloader_api():
-    """使用 respx 模拟所有 HTTP 请求"""
-    with respx.mock(assert_all_called=False, assert_all_mocked=True) as mock:
-        yield mock
+async def qb_client(mock_logger: LoggerProtocol) -> AsyncIterator[QBittorrentClient]:
+    client = QBittorrentClient(logger=mock_logger, host="http://qb-add")
+    yield client
+    await client.aclose()
 
 
 # --- Aria2Client Tests ---
 async def test_aria2_create_success(
-    mock_downloader_api: respx.Router, mock_logger: LoggerProtocol
+    respx_mock: respx.Router, mock_logger: LoggerProtocol
 ):
     """测试 Aria2Client 初始化时连接成功"""
-    mock_downloader_api.post("http://fake-aria2/rpc").mock(
+    respx_mock.post("http://fake-aria2/rpc").mock(
         return_value=Response(200, json={"result": "ok"})
     )
     client = await Aria2Client.create(
@@ -37,53 +70,76 @@ async def test_aria2_create_success(
 
 
 async def test_aria2_create_failure(
-    mock_downloader_api: respx.Router, mock_logger: LoggerProtocol
+    respx_mock: respx.Router, mock_logger: LoggerProtocol, monkeypatch
 ):
     """测试 Aria2Client 初始化时连接失败并抛出 ConnectionError"""
-    mock_downloader_api.post("http://fake-aria2/rpc").mock(
+    respx_mock.post("http://fake-aria2/rpc").mock(
         side_effect=RequestError("Connection failed")
     )
+    aclose = AsyncMock()
+    monkeypatch.setattr(Aria2Client, "aclose", aclose)
     with pytest.raises(ConnectionError, match="无法连接到 Aria2"):
         await Aria2Client.create(
             logger=mock_logger,
             rpc_url="http://fake-aria2/rpc",
         )
+    aclose.assert_awaited_once()  # 连接失败时关闭已创建的会话
 
 
-async def test_aria2_add_link(
-    mock_downloader_api: respx.Router, mock_logger: LoggerProtocol
-):
+async def test_aria2_add_link(respx_mock: respx.Router, aria2_client: Aria2Client):
     """测试 Aria2Client.add_link 的成功和失败路径"""
-    mock_downloader_api.post("http://a2/rpc", json__method="aria2.getVersion").mock(
-        return_value=Response(200, json={"result": "ok"})
+    add_route = respx_mock.post("http://a2/rpc", json__method="aria2.addUri").mock(
+        return_value=Response(200, json={"result": "gid1"})
     )
-    client = await Aria2Client.create(
-        logger=mock_logger,
-        rpc_url="http://a2/rpc",
-        secret="s3cr3t",
-        dir="test",
-    )
-
-    add_route = mock_downloader_api.post(
-        "http://a2/rpc", json__method="aria2.addUri"
-    ).mock(return_value=Response(200, json={"result": "gid1"}))
-    result = await client.add_link("magnet:?xt=1")
+    result = await aria2_client.add_link("magnet:?xt=1")
     assert result == {"result": "gid1"}
     assert add_route.called
+    params = json.loads(add_route.calls.last.request.content)["params"]
+    assert params == ["token:s3cr3t", ["magnet:?xt=1"], {"dir": "test"}]
 
     add_route.mock(side_effect=RequestError("Network down"))
     with pytest.raises(RequestError):
-        await client.add_link("magnet:?xt=2")
+        await aria2_client.add_link("magnet:?xt=2")
 
-    await client.aclose()
+
+async def test_aria2_add_links_multicall(
+    respx_mock: respx.Router, aria2_client: Aria2Client, monkeypatch
+):
+    """测试 Aria2Client.add_links 通过一次 multicall 请求提交多个任务"""
+    multicall_route = respx_mock.post(
+        "http://a2/rpc", json__method="system.multicall"
+    ).mock(
+        return_value=Response(
+            200,
+            json={"result": [["gid1"], {"code": 1, "message": "bad uri"}]},
+        )
+    )
+    results = await aria2_client.add_links(["magnet:?xt=1", "magnet:?xt=2"])
+
+    assert results == [
+        {"result": "gid1"},
+        {"error": {"code": 1, "message": "bad uri"}},
+    ]
+    assert multicall_route.call_count == 1
+    calls = json.loads(multicall_route.calls.last.request.content)["params"][0]
+    assert calls[0] == {
+        "methodName": "aria2.addUri",
+        "params": ["token:s3cr3t", ["magnet:?xt=1"], {"dir": "test"}],
+    }
+    assert await aria2_client.add_links([]) == []
+
+    # 超过单批上限时拆分为多次 multicall
+    monkeypatch.setattr("rss_downloader.downloaders.ARIA2_MULTICALL_BATCH", 1)
+    await aria2_client.add_links(["magnet:?xt=1", "magnet:?xt=2"])
+    assert multicall_route.call_count == 3
+    last_calls = json.loads(multicall_route.calls.last.request.content)["params"][0]
+    assert len(last_calls) == 1
 
 
 # --- QBittorrentClient Tests ---
-async def test_qb_create_success(
-    mock_downloader_api: respx.Router, mock_logger: LoggerProtocol
-):
+async def test_qb_create_success(respx_mock: respx.Router, mock_logger: LoggerProtocol):
     """测试 QBittorrentClient 初始化时登录成功"""
-    mock_downloader_api.post("http://fake-qb/api/v2/auth/login").mock(
+    respx_mock.post("http://fake-qb/api/v2/auth/login").mock(
         return_value=Response(200, text="Ok.")
     )
     client = await QBittorrentClient.create(
@@ -98,10 +154,10 @@ async def test_qb_create_success(
 
 
 async def test_qb_create_login_fail_auth(
-    mock_downloader_api: respx.Router, mock_logger: LoggerProtocol
+    respx_mock: respx.Router, mock_logger: LoggerProtocol
 ):
     """测试 QBittorrentClient 初始化时因认证失败而抛出 ConnectionError"""
-    mock_downloader_api.post("http://fake-qb/api/v2/auth/login").mock(
+    respx_mock.post("http://fake-qb/api/v2/auth/login").mock(
         return_value=Response(200, text="Fails.")
     )
     with pytest.raises(ConnectionError, match="无法连接到 qBittorrent"):
@@ -113,32 +169,41 @@ async def test_qb_create_login_fail_auth(
         )
 
 
-async def test_qb_add_link(
-    mock_downloader_api: respx.Router, mock_logger: LoggerProtocol
-):
+async def test_qb_add_link(respx_mock: respx.Router, qb_client: QBittorrentClient):
     """测试 QBittorrentClient.add_link 的成功和失败路径"""
-    mock_downloader_api.post("http://qb-add/api/v2/auth/login").mock(
-        return_value=Response(200, text="Ok.")
-    )
-    client = await QBittorrentClient.create(
-        logger=mock_logger,
-        host="http://qb-add",
-        username="admin",
-        password="password",
-    )
-
-    add_route = mock_downloader_api.post("http://qb-add/api/v2/torrents/add").mock(
+    add_route = respx_mock.post("http://qb-add/api/v2/torrents/add").mock(
         return_value=Response(200, text="Ok.")
     )
-    result = await client.add_link("magnet:?xt=1")
+    result = await qb_client.add_link("magnet:?xt=1")
     assert result is True
     assert add_route.called
 
     add_route.mock(return_value=Response(200, text="failed."))
     with pytest.raises(Exception, match="qBittorrent 添加任务失败"):
-        await client.add_link("magnet:?xt=2")
+        await qb_client.add_link("magnet:?xt=2")
 
-    await client.aclose()
+
+async def test_qb_add_link_retries_gateway_errors(
+    respx_mock: respx.Router,
+    qb_client: QBittorrentClient,
+    mock_logger: LoggerProtocol,
+    monkeypatch,
+):
+    """测试下载器短暂返回网关错误时退避重试，重试耗尽后返回最后的错误"""
+    monkeypatch.setattr("rss_downloader.downloaders.RETRY_BACKOFF_BASE", 0)
+
+    add_route = respx_mock.post("http://qb-add/api/v2/torrents/add").mock(
+        side_effect=[Response(503), Response(502), Response(200, text="Ok.")]
+    )
+    assert await qb_client.add_link("magnet:?xt=1") is True
+    assert add_route.call_count == 3
+    assert mock_logger.warning.call_count == 2
+
+    add_route.mock(side_effect=None, return_value=Response(503))
+    add_route.reset()
+    with pytest.raises(HTTPStatusError):
+        await qb_client.add_link("magnet:?xt=2")
+    assert add_route.call_count == 4  # 首次请求 + 3 次重试
 
 
 # --- TransmissionClient Tests ---
@@ -184,14 +249,26 @@ class MockTransmissionServer:
 
 @pytest.fixture
 def mock_transmission_server(
-    mock_downloader_api: respx.Router, transmission_rpc_url: str
+    respx_mock: respx.Router, transmission_rpc_url: str
 ) -> MockTransmissionServer:
     """设置并返回一个可配置的 Transmission 模拟服务器实例"""
     server = MockTransmissionServer()
-    mock_downloader_api.post(transmission_rpc_url).mock(side_effect=server.handler)
+    respx_mock.post(transmission_rpc_url).mock(side_effect=server.handler)
     return server
 
 
+@pytest.fixture
+async def transmission_client(
+    mock_transmission_server: MockTransmissionServer, mock_logger: LoggerProtocol
+) -> AsyncIterator[TransmissionClient]:
+    """通过 create 建立 session 的 Transmission 客户端"""
+    client = await TransmissionClient.create(
+        logger=mock_logger, host="http://fake-trans"
+    )
+    yield client
+    await client.aclose()
+
+
 async def test_transmission_create_success(
     mock_transmission_server: MockTransmissionServer,
     mock_logger: LoggerProtocol,
@@ -206,62 +283,45 @@ async def test_transmission_create_success(
 
 
 async def test_transmission_create_failure(
-    mock_downloader_api: respx.Router,
+    respx_mock: respx.Router,
     mock_logger: LoggerProtocol,
     transmission_rpc_url: str,
 ):
     """测试 TransmissionClient 初始化时因网络错误失败"""
-    mock_downloader_api.post(transmission_rpc_url).mock(
+    respx_mock.post(transmission_rpc_url).mock(
         side_effect=RequestError("Network Error")
     )
     with pytest.raises(ConnectionError, match="无法连接到 Transmission"):
         await TransmissionClient.create(logger=mock_logger, host="http://fake-trans")
 
 
-async def test_transmission_add_link_success(
-    mock_transmission_server: MockTransmissionServer,
-    mock_logger: LoggerProtocol,
-):
+async def test_transmission_add_link_success(transmission_client: TransmissionClient):
     """测试 TransmissionClient.add_link 成功"""
-    client = await TransmissionClient.create(
-        logger=mock_logger, host="http://fake-trans"
-    )
-    result = await client.add_link("magnet:?xt=1")
+    result = await transmission_client.add_link("magnet:?xt=1")
     assert result == {"result": "success"}
-    await client.aclose()
 
 
 async def test_transmission_session_id_expired_and_retry(
     mock_transmission_server: MockTransmissionServer,
-    mock_logger: LoggerProtocol,
+    transmission_client: TransmissionClient,
 ):
     """测试 session ID 过期后，客户端能自动重试并成功"""
-    client = await TransmissionClient.create(
-        logger=mock_logger, host="http://fake-trans"
-    )
-
     # 模拟服务器 session 过期
     mock_transmission_server.current_session_id = (
         mock_transmission_server.next_session_id
     )
 
-    result = await client.add_link("magnet:?xt=1")
+    result = await transmission_client.add_link("magnet:?xt=1")
     assert result == {"result": "success"}
-    await client.aclose()
 
 
 async def test_transmission_add_link_failure(
     mock_transmission_server: MockTransmissionServer,
-    mock_logger: LoggerProtocol,
+    transmission_client: TransmissionClient,
 ):
     """测试当 RPC 调用返回失败时，add_link 抛出异常"""
     # 设置服务器在收到 torrent-add 请求时返回失败
     mock_transmission_server.fail_add_link = True
 
-    client = await TransmissionClient.create(
-        logger=mock_logger, host="http://fake-trans"
-    )
     with pytest.raises(Exception, match="Transmission 添加任务失败: duplicate torrent"):
-        await client.add_link("magnet:?xt=1")
-
-    await client.aclose()
+        await transmission_client.add_link("magnet:?xt=1")
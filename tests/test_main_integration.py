@@ -1,18 +1,43 @@
 from datetime import datetime
 from unittest.mock import AsyncMock, MagicMock
 
+import anyio
 import pytest
 from pydantic import HttpUrl
 
 from rss_downloader.config import ConfigManager
 from rss_downloader.database import Database
+from rss_downloader.downloaders import Aria2Client
 from rss_downloader.logger import LoggerProtocol
-from rss_downloader.main import DownloaderError, ItemNotFoundError, RSSDownloader
+from rss_downloader.main import (
+    SUBMIT_CONCURRENCY,
+    DownloaderError,
+    ItemNotFoundError,
+    RSSDownloader,
+)
 from rss_downloader.models import DownloadRecord, ParsedItem
-from rss_downloader.parser import RSSParser
+from rss_downloader.parser import FeedCacheEntry
 
 pytestmark = pytest.mark.anyio
 
+# 测试数据使用固定时间，结果不随运行时刻变化
+FIXED_TIME = datetime(2025, 1, 1, 12, 0, 0)
+FEED_CACHE = FeedCacheEntry("TestFeed", "config-hash", '"v1"', None, "body-hash")
+
+ParseResult = tuple[int, list[ParsedItem], FeedCacheEntry | None]
+
+
+class StubParser:
+    """只返回预设结果的 RSSParser 替身，无需 MagicMock(spec=...) 遍历类属性"""
+
+    def __init__(self, result: ParseResult | Exception):
+        self.result = result
+
+    async def parse_feed(self, feed_name: str, feed_url: HttpUrl) -> ParseResult:
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
 
 async def test_rss_downloader_run_flow(
     test_config: ConfigManager, test_db: Database, mock_logger: LoggerProtocol
@@ -26,35 +51,40 @@ async def test_rss_downloader_run_flow(
         }
     )
 
-    mock_parser = MagicMock(spec=RSSParser)
     item1 = ParsedItem(
         title="New Episode 1",
         url=HttpUrl("http://item/1"),
         download_url=HttpUrl("http://download/1"),
-        published_time=datetime.now(),
+        published_time=FIXED_TIME,
     )
     item2 = ParsedItem(
         title="Already Downloaded",
         url=HttpUrl("http://item/2"),
         download_url=HttpUrl("http://download/2"),
-        published_time=datetime.now(),
+        published_time=FIXED_TIME,
     )
     item3 = ParsedItem(
         title="Download Fails",
         url=HttpUrl("http://item/3"),
         download_url=HttpUrl("http://download/3"),
-        published_time=datetime.now(),
+        published_time=FIXED_TIME,
     )
-    mock_parser.parse_feed = AsyncMock(return_value=(3, [item1, item2, item3]))
+    # item1 在源中重复出现，只应提交一次
+    parser = StubParser((4, [item1, item2, item3, item1], FEED_CACHE))
 
-    mock_aria2_client = AsyncMock()
+    # spec 限定为真实客户端的接口，调用不存在的方法或参数不匹配时会报错
+    mock_aria2_client = AsyncMock(spec=Aria2Client)
 
     async def mock_add_link(url, **kwargs):
         if url == str(item3.download_url):
             return {"error": "Fake RPC error"}
         return {"result": "gid1"}
 
-    mock_aria2_client.add_link = AsyncMock(side_effect=mock_add_link)
+    async def mock_add_links(urls, **kwargs):
+        return [await mock_add_link(url) for url in urls]
+
+    mock_aria2_client.add_link.side_effect = mock_add_link
+    mock_aria2_client.add_links.side_effect = mock_add_links
 
     # 在数据库中预先插入一条已下载记录
     pre_record = DownloadRecord(
@@ -63,8 +93,8 @@ async def test_rss_downloader_run_flow(
         download_url=item2.download_url,
         feed_name="TestFeed",
         feed_url=HttpUrl(feed_url),
-        published_time=datetime.now(),
-        download_time=datetime.now(),
+        published_time=FIXED_TIME,
+        download_time=FIXED_TIME,
         status=1,
         mode=0,
         downloader="aria2",
@@ -75,7 +105,7 @@ async def test_rss_downloader_run_flow(
         config=test_config,
         database=test_db,
         logger=mock_logger,
-        parser=mock_parser,
+        parser=parser,  # type: ignore
         aria2=mock_aria2_client,
         qbittorrent=None,
         transmission=None,
@@ -88,6 +118,12 @@ async def test_rss_downloader_run_flow(
     results, total = await test_db.search_downloads(limit=100)
     assert total == 3  # 1 (pre-record) + 1 (new success) + 1 (new fail)
 
+    # 新条目通过 multicall 一次性提交
+    mock_aria2_client.add_links.assert_awaited_once_with(
+        [str(item1.download_url), str(item3.download_url)]
+    )
+    mock_aria2_client.add_link.assert_not_called()
+
     results_by_title = {r.title: r for r in results}
     assert (
         "New Episode 1" in results_by_title
@@ -97,6 +133,55 @@ async def test_rss_downloader_run_flow(
         "Download Fails" in results_by_title
         and results_by_title["Download Fails"].status == 0
     )
+    # 有任务失败，不保存条件请求信息，下次运行重新获取并重试
+    assert await test_db.get_feed_cache("TestFeed", "config-hash") is None
+
+
+async def test_process_feed_saves_cache_after_insert(
+    test_config: ConfigManager,
+    test_db: Database,
+    mock_logger: LoggerProtocol,
+    monkeypatch,
+):
+    """测试条目全部写入数据库后才保存条件请求信息"""
+    feed_url = HttpUrl("http://test.com/rss.xml")
+    await test_config.update(
+        {
+            "aria2": {"rpc": "http://fake-aria2"},
+            "feeds": [{"name": "TestFeed", "url": str(feed_url)}],
+        }
+    )
+    item = ParsedItem(
+        title="New Episode",
+        url=HttpUrl("http://item/1"),
+        download_url=HttpUrl("http://download/1"),
+        published_time=FIXED_TIME,
+    )
+    aria2 = AsyncMock(spec=Aria2Client)
+    aria2.add_link.return_value = {"result": "gid1"}
+    downloader = RSSDownloader(
+        config=test_config,
+        database=test_db,
+        logger=mock_logger,
+        parser=StubParser((1, [item], FEED_CACHE)),  # type: ignore
+        aria2=aria2,
+        qbittorrent=None,
+        transmission=None,
+        webhook_service=AsyncMock(),
+    )
+
+    # 写入失败时 insert_many 返回 0，不保存
+    with monkeypatch.context() as m:
+        m.setattr(test_db, "insert_many", AsyncMock(return_value=0))
+        await downloader.process_feed("TestFeed", feed_url)
+    assert await test_db.get_feed_cache("TestFeed", "config-hash") is None
+
+    assert await downloader.process_feed("TestFeed", feed_url) == (1, 1, 1)
+    assert await test_db.get_feed_cache("TestFeed", "config-hash") == (
+        '"v1"',
+        None,
+        "body-hash",
+    )
 
 
 async def test_run_with_processing_error(
@@ -112,14 +197,13 @@ async def test_run_with_processing_error(
         }
     )
 
-    mock_parser = MagicMock(spec=RSSParser)
-    mock_parser.parse_feed = AsyncMock(side_effect=Exception("Something went wrong!"))
+    parser = StubParser(Exception("Something went wrong!"))
 
     downloader = RSSDownloader(
         config=test_config,
         database=test_db,
         logger=mock_logger,
-        parser=mock_parser,
+        parser=parser,  # type: ignore
         aria2=AsyncMock(),
         qbittorrent=None,
         transmission=None,
@@ -153,7 +237,7 @@ async def test_send_to_downloader_not_configured(
         "download_url": "http://a/dl",
         "feed_name": "a",
         "feed_url": "http://a/rss",
-        "published_time": datetime.now(),
+        "published_time": FIXED_TIME,
     }
 
     with pytest.raises(DownloaderError, match="下载器 aria2 未配置或不可用"):
@@ -177,8 +261,8 @@ async def test_redownload_success(
         download_url=HttpUrl("http://download/123"),
         feed_name="TestFeed",
         feed_url=HttpUrl("http://test.com/rss.xml"),
-        published_time=datetime.now(),
-        download_time=datetime.now(),
+        published_time=FIXED_TIME,
+        download_time=FIXED_TIME,
         status=0,
         mode=0,
         downloader="aria2",
@@ -234,3 +318,49 @@ async def test_redownload_item_failure(
 
     with pytest.raises(ValueError, match="没有下载链接"):
         await downloader.redownload(id=1, downloader="aria2")
+
+
+async def test_submit_links_concurrently(
+    test_config: ConfigManager, test_db: Database, mock_logger: LoggerProtocol
+):
+    """测试非 aria2 下载器的多个链接并发提交，且结果顺序与链接一致"""
+    in_flight = max_in_flight = 0
+
+    async def mock_add_link(url):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        if url.endswith("bad"):
+            raise Exception("Fake qB error")
+        return True
+
+    mock_qb = MagicMock()
+    mock_qb.add_link = AsyncMock(side_effect=mock_add_link)
+
+    downloader = RSSDownloader(
+        config=test_config,
+        database=test_db,
+        logger=mock_logger,
+        parser=MagicMock(),
+        aria2=None,
+        qbittorrent=mock_qb,
+        transmission=None,
+        webhook_service=MagicMock(),
+    )
+
+    results = await downloader._submit_links(
+        ["http://dl/1", "http://dl/bad", "http://dl/3"], "qbittorrent"
+    )
+
+    assert results == [(True, ""), (False, "Fake qB error"), (True, "")]
+    assert max_in_flight == 3
+
+    # 同时提交的任务数受 SUBMIT_CONCURRENCY 限制
+    max_in_flight = 0
+    results = await downloader._submit_links(
+        [f"http://dl/{i}" for i in range(SUBMIT_CONCURRENCY + 4)], "qbittorrent"
+    )
+    assert all(status for status, _ in results)
+    assert max_in_flight == SUBMIT_CONCURRENCY
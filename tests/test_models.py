@@ -1,3 +1,5 @@
+from datetime import datetime, timezone
+
 import pytest
 from feedparser.util import FeedParserDict
 from pydantic import HttpUrl, ValidationError
@@ -5,6 +7,7 @@ from pydantic import HttpUrl, ValidationError
 from rss_downloader.models import (
     Config,
     DefaultEntry,
+    Downloader,
     FeedConfig,
     LogConfig,
     MikanEntry,
@@ -45,43 +48,26 @@ def test_feed_config_unique_names_validator():
         Config.model_validate(config_data_duplicates)
 
 
-def test_downloader_config_exists_validator():
+@pytest.mark.parametrize("downloader", ["aria2", "qbittorrent", "transmission"])
+def test_downloader_config_exists_validator(downloader: Downloader):
     """测试当 feed 使用某个下载器时，该下载器的配置必须存在。"""
-    # 场景1: 使用了 aria2，但没有提供 aria2 配置
-    feeds = [FeedConfig(name="Feed A", url=HttpUrl("http://a.com"), downloader="aria2")]
-    config_data = {"feeds": feeds, "aria2": None}  # aria2 配置为 None
+    feeds = [
+        FeedConfig(name="Feed A", url=HttpUrl("http://a.com"), downloader=downloader)
+    ]
+    config_data = {"feeds": feeds, downloader: None}
 
     with pytest.raises(
-        ValidationError, match="Feed 中指定了 aria2 下载器, 但未提供 \\[aria2\\] 配置"
+        ValidationError,
+        match=f"Feed 中指定了 {downloader} 下载器, 但未提供 \\[{downloader}\\] 配置",
     ):
         Config.model_validate(config_data)
 
-    # 场景2: 使用了 qbittorrent，但没有提供 qbittorrent 配置
+
+def test_downloader_config_exists_validator_ok():
+    """测试 feed 使用的下载器已配置时验证通过。"""
     feeds_qb = [
         FeedConfig(name="Feed B", url=HttpUrl("http://b.com"), downloader="qbittorrent")
     ]
-    config_data_qb = {"feeds": feeds_qb, "qbittorrent": None}
-    with pytest.raises(
-        ValidationError,
-        match="Feed 中指定了 qbittorrent 下载器, 但未提供 \\[qbittorrent\\] 配置",
-    ):
-        Config.model_validate(config_data_qb)
-
-    # 场景3: 使用了 transmission，但没有提供 transmission 配置
-    feeds_tr = [
-        FeedConfig(
-            name="Feed C", url=HttpUrl("http://c.com"), downloader="transmission"
-        )
-    ]
-    config_data_tr = {"feeds": feeds_tr, "transmission": None}
-
-    with pytest.raises(
-        ValidationError,
-        match="Feed 中指定了 transmission 下载器, 但未提供 \\[transmission\\] 配置",
-    ):
-        Config.model_validate(config_data_tr)
-
-    # 正常情况: 配置存在
     config_data_ok = {
         "feeds": feeds_qb,
         "qbittorrent": {"host": "http://localhost:8080"},
@@ -89,21 +75,26 @@ def test_downloader_config_exists_validator():
     Config.model_validate(config_data_ok)  # 不应抛出异常
 
 
-def test_feed_config_auto_set_extractor():
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("https://mikanime.tv/rss.xml", "mikan"),
+        ("https://nyaa.si/?page=rss", "nyaa"),
+        # 子域名按后缀匹配，仅名称结尾相同的其他域名不匹配
+        ("https://share.dmhy.org/rss.xml", "dmhy"),
+        ("https://notnyaa.si/rss", "default"),
+        # 未知 URL
+        ("http://example.com/rss", "default"),
+    ],
+)
+def test_feed_config_auto_set_extractor(url: str, expected: str):
     """测试 FeedConfig 是否能根据 URL 自动设置 content_extractor。"""
-    # Mikan URL
-    feed_mikan = FeedConfig(name="Mikan", url=HttpUrl("https://mikanime.tv/rss.xml"))
-    assert feed_mikan.content_extractor == "mikan"
+    feed = FeedConfig(name="Feed", url=HttpUrl(url))
+    assert feed.content_extractor == expected
 
-    # Nyaa URL
-    feed_nyaa = FeedConfig(name="Nyaa", url=HttpUrl("https://nyaa.si/?page=rss"))
-    assert feed_nyaa.content_extractor == "nyaa"
 
-    # 未知 URL
-    feed_default = FeedConfig(name="Default", url=HttpUrl("http://example.com/rss"))
-    assert feed_default.content_extractor == "default"
-
-    # 用户手动指定时，不应被覆盖
+def test_feed_config_manual_extractor():
+    """测试用户手动指定 content_extractor 时，不应被覆盖。"""
     feed_manual = FeedConfig(
         name="Manual",
         url=HttpUrl("https://mikanime.tv/rss.xml"),
@@ -141,6 +132,10 @@ def test_torrent_entry_mixin_pre_process():
     assert str(validated.url) == "https://mikanime.tv/episode/1"
     assert str(validated.download_url) == "https://mikanime.tv/download/1.torrent"
     assert validated.published_time.year == 2025
+    # published_parsed 为 UTC 时间
+    assert validated.published_time == datetime.fromtimestamp(
+        datetime(2025, 9, 10, 12, tzinfo=timezone.utc).timestamp()
+    )
 
     # 场景2：模拟一个 Nyaa entry (download_url 和 link 相同)
     nyaa_entry_data = FeedParserDict(
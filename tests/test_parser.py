@@ -7,6 +7,7 @@ from httpx import Response
 from pydantic import HttpUrl
 
 from rss_downloader.config import ConfigManager
+from rss_downloader.database import Database
 from rss_downloader.logger import LoggerProtocol
 from rss_downloader.parser import RSSParser
 
@@ -91,7 +92,9 @@ async def test_match_filters_no_include_rules(
 
 @respx.mock
 async def test_parse_feed_scenarios(
-    test_config: ConfigManager, mock_logger: LoggerProtocol
+    test_config: ConfigManager,
+    mock_logger: LoggerProtocol,
+    http_client: httpx.AsyncClient,
 ):
     """全面测试 parse_feed 方法的各种场景"""
     feed_url = HttpUrl("http://test.com/rss")
@@ -102,39 +105,165 @@ async def test_parse_feed_scenarios(
                 {
                     "name": "TestFeed",
                     "url": str(feed_url),
-                    "include": ["Success"],
+                    # 未匹配的条目不会被校验，需匹配 Invalid 才能触发解析错误
+                    "include": ["Success", "Invalid"],
                 }
             ],
         }
     )
 
-    async with httpx.AsyncClient() as http_client:
-        parser = RSSParser(
-            config=test_config, logger=mock_logger, http_client=http_client
+    parser = RSSParser(config=test_config, logger=mock_logger, http_client=http_client)
+
+    # 场景1: 成功解析并匹配
+    respx.get(str(feed_url)).mock(return_value=Response(200, text=SAMPLE_RSS_XML))
+    total, matched, _ = await parser.parse_feed("TestFeed", feed_url)
+    assert total == 3
+    assert len(matched) == 1
+    assert matched[0].title == "[Test] Success Case 1"
+    mock_logger.error.assert_called_once()  # 断言 Invalid Case 3 导致了一次解析错误
+    mock_logger.reset_mock()
+
+    # 场景2: Feed 解析出错 (bozo=1), 模拟一个无效的 XML
+    respx.get(str(feed_url)).mock(return_value=Response(200, text="<rss><channel>"))
+    total, matched, feed_cache = await parser.parse_feed("TestFeed", feed_url)
+    assert total == 0
+    assert len(matched) == 0
+    assert feed_cache is None
+    mock_logger.error.assert_called_once()
+    args, _ = mock_logger.error.call_args
+    assert args[0].startswith("RSS 源解析错误，请检查 TestFeed:")
+    mock_logger.reset_mock()
+
+    # 场景3: Feed 内容为空
+    respx.get(str(feed_url)).mock(return_value=Response(200, text=""))
+    total, matched, feed_cache = await parser.parse_feed("TestFeed", feed_url)
+    assert total == 0
+    assert len(matched) == 0
+    assert feed_cache is None
+    mock_logger.error.assert_called_with(f"Feed 为空或无法访问 ({feed_url})")
+
+
+@respx.mock
+async def test_parse_feed_conditional_get(
+    test_config: ConfigManager,
+    test_db: Database,
+    mock_logger: LoggerProtocol,
+    http_client: httpx.AsyncClient,
+):
+    """测试使用 ETag/Last-Modified 条件请求，源未更新时跳过解析"""
+    feed_url = HttpUrl("http://test.com/rss")
+    await test_config.update(
+        {
+            "aria2": {"rpc": "http://aria2"},
+            "feeds": [{"name": "TestFeed", "url": str(feed_url)}],
+        }
+    )
+
+    parser = RSSParser(
+        config=test_config, logger=mock_logger, http_client=http_client, db=test_db
+    )
+
+    route = respx.get(str(feed_url)).mock(
+        return_value=Response(
+            200,
+            text=SAMPLE_RSS_XML,
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025"},
         )
+    )
+    total, _, feed_cache = await parser.parse_feed("TestFeed", feed_url)
+    assert total == 3
+    assert "If-None-Match" not in route.calls.last.request.headers
+    assert feed_cache is not None
+    assert (feed_cache.etag, feed_cache.last_modified) == (
+        '"v1"',
+        "Wed, 01 Jan 2025",
+    )
+
+    # 条件请求信息由调用方处理完条目后保存，未保存前仍完整获取
+    total, _, _ = await parser.parse_feed("TestFeed", feed_url)
+    assert total == 3
+    assert "If-None-Match" not in route.calls.last.request.headers
+    await test_db.save_feed_cache(*feed_cache)
+
+    # 源未更新，返回 304
+    route.mock(return_value=Response(304))
+    result = await parser.parse_feed("TestFeed", feed_url)
+    assert result == (0, [], None)
+    request = route.calls.last.request
+    assert request.headers["If-None-Match"] == '"v1"'
+    assert request.headers["If-Modified-Since"] == "Wed, 01 Jan 2025"
+
+    # 服务端不支持条件请求，但内容未变化
+    route.mock(return_value=Response(200, text=SAMPLE_RSS_XML))
+    result = await parser.parse_feed("TestFeed", feed_url)
+    assert result == (0, [], None)
+
+
+@respx.mock
+async def test_parse_feed_cache_invalidated_by_rule_change(
+    test_config: ConfigManager,
+    test_db: Database,
+    mock_logger: LoggerProtocol,
+    http_client: httpx.AsyncClient,
+):
+    """测试过滤规则变化后不再发送条件请求，未变化的内容按新规则重新匹配"""
+    feed_url = HttpUrl("http://test.com/rss")
+    feed = {"name": "TestFeed", "url": str(feed_url), "include": ["Success"]}
+    await test_config.update({"aria2": {"rpc": "http://aria2"}, "feeds": [feed]})
+
+    parser = RSSParser(
+        config=test_config, logger=mock_logger, http_client=http_client, db=test_db
+    )
+
+    def handler(request: httpx.Request) -> Response:
+        if request.headers.get("If-None-Match") == '"v1"':
+            return Response(304)
+        return Response(200, text=SAMPLE_RSS_XML, headers={"ETag": '"v1"'})
+
+    route = respx.get(str(feed_url)).mock(side_effect=handler)
+    _, matched, feed_cache = await parser.parse_feed("TestFeed", feed_url)
+    assert [item.title for item in matched] == ["[Test] Success Case 1"]
+    assert feed_cache is not None
+    await test_db.save_feed_cache(*feed_cache)
+
+    await test_config.update({"feeds": [feed | {"include": ["Filtered"]}]})
+    total, matched, _ = await parser.parse_feed("TestFeed", feed_url)
+    assert "If-None-Match" not in route.calls.last.request.headers
+    assert total == 3
+    assert [item.title for item in matched] == ["[Test] Filtered Case 2"]
+
+
+@respx.mock
+async def test_parse_feed_body_hash_per_feed_config(
+    test_config: ConfigManager,
+    test_db: Database,
+    mock_logger: LoggerProtocol,
+    http_client: httpx.AsyncClient,
+):
+    """测试内容未变化的跳过判断按源名称和配置区分，共用地址的源互不影响"""
+    feed_url = HttpUrl("http://test.com/rss")
+    feed_a = {"name": "A", "url": str(feed_url), "include": ["Success"]}
+    feed_b = {"name": "B", "url": str(feed_url), "include": ["Filtered"]}
+    await test_config.update(
+        {"aria2": {"rpc": "http://aria2"}, "feeds": [feed_a, feed_b]}
+    )
+
+    parser = RSSParser(
+        config=test_config, logger=mock_logger, http_client=http_client, db=test_db
+    )
+    # 服务端不支持条件请求，只能比较内容摘要
+    respx.get(str(feed_url)).mock(return_value=Response(200, text=SAMPLE_RSS_XML))
+
+    _, _, feed_cache = await parser.parse_feed("A", feed_url)
+    assert feed_cache is not None
+    await test_db.save_feed_cache(*feed_cache)
+    assert await parser.parse_feed("A", feed_url) == (0, [], None)
+
+    # 共用地址的其他源不受 A 的缓存影响
+    _, matched, _ = await parser.parse_feed("B", feed_url)
+    assert [item.title for item in matched] == ["[Test] Filtered Case 2"]
 
-        # 场景1: 成功解析并匹配
-        respx.get(str(feed_url)).mock(return_value=Response(200, text=SAMPLE_RSS_XML))
-        total, matched = await parser.parse_feed("TestFeed", feed_url)
-        assert total == 3
-        assert len(matched) == 1
-        assert matched[0].title == "[Test] Success Case 1"
-        mock_logger.error.assert_called_once()  # 断言 Invalid Case 3 导致了一次解析错误
-        mock_logger.reset_mock()
-
-        # 场景2: Feed 解析出错 (bozo=1), 模拟一个无效的 XML
-        respx.get(str(feed_url)).mock(return_value=Response(200, text="<rss><channel>"))
-        total, matched = await parser.parse_feed("TestFeed", feed_url)
-        assert total == 0
-        assert len(matched) == 0
-        mock_logger.error.assert_called_once()
-        args, _ = mock_logger.error.call_args
-        assert args[0].startswith("RSS 源解析错误，请检查 TestFeed:")
-        mock_logger.reset_mock()
-
-        # 场景3: Feed 内容为空
-        respx.get(str(feed_url)).mock(return_value=Response(200, text=""))
-        total, matched = await parser.parse_feed("TestFeed", feed_url)
-        assert total == 0
-        assert len(matched) == 0
-        mock_logger.error.assert_called_with(f"Feed 为空或无法访问 ({feed_url})")
+    # A 的规则变化后，相同内容按新规则重新匹配
+    await test_config.update({"feeds": [feed_a | {"include": ["Filtered"]}, feed_b]})
+    _, matched, _ = await parser.parse_feed("A", feed_url)
+    assert [item.title for item in matched] == ["[Test] Filtered Case 2"]
@@ -4,6 +4,7 @@ import pytest
 from httpx import AsyncClient
 
 from rss_downloader.config import ConfigManager
+from rss_downloader.database import Database
 from rss_downloader.downloaders import (
     Aria2Client,
     QBittorrentClient,
@@ -38,6 +39,8 @@ async def test_app_services_create_aria2_failure(
         assert "初始化 Aria2 客户端失败" in args[0]
         assert "Fake Connection Error" in args[0]
 
+        await services.close()
+
 
 async def test_app_services_create_qbittorent_failure(
     test_config: ConfigManager, mock_logger: LoggerProtocol, monkeypatch
@@ -61,6 +64,8 @@ async def test_app_services_create_qbittorent_failure(
         assert "初始化 qBittorrent 客户端失败" in args[0]
         assert "Fake Connection Error" in args[0]
 
+        await services.close()
+
 
 async def test_app_services_create_transmission_failure(
     test_config: ConfigManager, mock_logger: LoggerProtocol, monkeypatch
@@ -84,6 +89,8 @@ async def test_app_services_create_transmission_failure(
         assert "初始化 Transmission 客户端失败" in args[0]
         assert "Fake Connection Error" in args[0]
 
+        await services.close()
+
 
 async def test_app_services_close(mock_logger: LoggerProtocol):
     """测试 AppServices.close 方法是否能正确关闭其管理的资源"""
@@ -98,11 +105,14 @@ async def test_app_services_close(mock_logger: LoggerProtocol):
     mock_trans = MagicMock(spec=TransmissionClient)
     mock_trans.aclose = AsyncMock()
 
+    mock_db = MagicMock(spec=Database)
+    mock_db.close = AsyncMock()
+
     # 3. 使用准备好的 Mocks 初始化 AppServices
     services_instance = AppServices(
         config=MagicMock(),
         logger=mock_logger,
-        db=MagicMock(),
+        db=mock_db,
         rss_downloader=MagicMock(),
         aria2=mock_aria2,
         qbittorrent=mock_qb,
@@ -114,6 +124,7 @@ async def test_app_services_close(mock_logger: LoggerProtocol):
     await services_instance.close()
 
     mock_http_client.aclose.assert_awaited_once()
+    mock_db.close.assert_awaited_once()
     mock_aria2.aclose.assert_awaited_once()
     mock_qb.aclose.assert_awaited_once()
     mock_trans.aclose.assert_awaited_once()
@@ -1,14 +1,21 @@
-from datetime import datetime, time
+from datetime import datetime, time, timedelta, timezone
 from unittest.mock import AsyncMock, patch
 
 import pytest
 from httpx import AsyncClient
-from pydantic import ValidationError
+from pydantic import HttpUrl, ValidationError
 
+from rss_downloader.app import create_app
 from rss_downloader.main import DownloaderError, ItemNotFoundError
-from rss_downloader.models import Config
+from rss_downloader.models import Config, DownloadRecord
 from rss_downloader.services import AppServices
-from rss_downloader.web import SearchFilters, format_datetime
+from rss_downloader.web import (
+    SearchFilters,
+    decode_cursor,
+    encode_cursor,
+    format_datetime,
+    templates,
+)
 
 pytestmark = pytest.mark.anyio
 
@@ -21,6 +28,11 @@ def test_format_datetime_filter():
     assert format_datetime(dt, "%Y/%m/%d") == "2025/09/11"
     assert format_datetime(None) == ""
 
+    # 默认格式不输出微秒和时区
+    assert format_datetime(dt.replace(microsecond=123456)) == "2025-09-11 08:30:00"
+    aware = dt.replace(tzinfo=timezone(timedelta(hours=8)))
+    assert format_datetime(aware) == "2025-09-11 08:30:00"
+
 
 def test_search_filters_date_range_fix():
     """测试 SearchFilters 模型校验器是否能自动修正日期范围"""
@@ -50,16 +62,70 @@ async def test_get_index_page(client: AsyncClient, mock_services: AppServices):
     response = await client.get("/")
     assert response.status_code == 200
     assert "下载记录" in response.text
+    assert response.headers["content-encoding"] == "gzip"
 
     # 验证 db.search_downloads 方法被正确调用了一次
     mock_services.db.search_downloads.assert_awaited_once()
 
+    # 翻页链接保留其他查询参数，只替换页码
+    mock_services.db.search_downloads.return_value = ([], 100)
+    response = await client.get("/?title=abc&page=2")
+    assert "/?title=abc&amp;page=1" in response.text
+    assert "/?title=abc&amp;page=3" in response.text
+
+    # 有记录时下一页链接携带最后一条记录的游标，游标传给数据库查询
+    record = DownloadRecord(
+        id=7,
+        title="Item",
+        url=HttpUrl("http://example.com/item"),
+        download_url="http://example.com/item.torrent",
+        feed_name="Feed",
+        feed_url=HttpUrl("http://example.com/feed.xml"),
+        published_time=datetime(2025, 1, 1),
+        download_time=datetime(2025, 1, 2, 3, 4, 5),
+    )
+    mock_services.db.search_downloads.return_value = ([record], 100)
+    response = await client.get("/?page=2")
+    cursor = encode_cursor(record)
+    assert f"/?page=3&amp;cursor={cursor}" in response.text
+
+    response = await client.get(f"/?page=3&cursor={cursor}")
+    assert mock_services.db.search_downloads.await_args.kwargs["after"] == (
+        datetime(2025, 1, 2, 3, 4, 5),
+        "Feed",
+        datetime(2025, 1, 1),
+        7,
+    )
+    # 上一页回到 OFFSET 分页
+    assert '/?page=2"' in response.text
+    assert decode_cursor("not-a-cursor") is None
+
 
-async def test_config_page_route(client: AsyncClient):
+async def test_config_page_route(client: AsyncClient, mock_services: AppServices):
     """测试 /config-page 页面路由"""
     response = await client.get("/config-page")
     assert response.status_code == 200
     assert "配置管理" in response.text
+    assert "http://test/static/css/output.css" in response.text
+    assert response.headers["cache-control"] == "private, no-cache"
+    etag = response.headers["etag"]
+
+    # 再次访问复用缓存的页面内容，不重新渲染模板
+    with patch.object(templates, "get_template") as get_template:
+        cached = await client.get("/config-page")
+    get_template.assert_not_called()
+    assert cached.text == response.text
+    assert cached.headers["etag"] == etag
+
+    # 浏览器携带 ETag 重新验证，页面未变化时返回 304
+    revalidated = await client.get("/config-page", headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+    stale = await client.get("/config-page", headers={"If-None-Match": '"old"'})
+    assert stale.status_code == 200
+
+    # 渲染缓存属于各自的应用实例
+    assert create_app(services=mock_services).state.config_page_cache == {}
 
 
 async def test_get_config_api(client: AsyncClient, mock_services: AppServices):
@@ -1,6 +1,7 @@
 import json
 from datetime import datetime
 
+import anyio
 import httpx
 import pytest
 import respx
@@ -15,12 +16,6 @@ from rss_downloader.webhook import WebhookService
 pytestmark = pytest.mark.anyio
 
 
-@pytest.fixture
-def mock_http_client() -> httpx.AsyncClient:
-    """真实的 HTTP 客户端，用于集成测试"""
-    return httpx.AsyncClient()
-
-
 @pytest.fixture
 def successful_record() -> DownloadRecord:
     """测试用的成功下载记录"""
@@ -43,7 +38,7 @@ async def test_send_single_webhook_success(
     mock_logger: LoggerProtocol,
     test_config: ConfigManager,
     successful_record: DownloadRecord,
-    mock_http_client: httpx.AsyncClient,
+    http_client: httpx.AsyncClient,
 ):
     """测试成功发送 webhook 通知"""
     webhook_url = "https://discord.com/api/webhooks/123/abc"
@@ -59,7 +54,7 @@ async def test_send_single_webhook_success(
         webhook_route = mock_router.post(webhook_url).mock(return_value=Response(204))
 
         service = WebhookService(
-            config=test_config, logger=mock_logger, http_client=mock_http_client
+            config=test_config, logger=mock_logger, http_client=http_client
         )
         await service.send(successful_record)
 
@@ -78,7 +73,7 @@ async def test_sends_to_enabled_webhooks_only(
     mock_logger: LoggerProtocol,
     test_config: ConfigManager,
     successful_record: DownloadRecord,
-    mock_http_client: httpx.AsyncClient,
+    http_client: httpx.AsyncClient,
 ):
     """测试仅向启用的 webhook 发送通知"""
     enabled_url = "https://discord.com/api/webhooks/123/enabled"
@@ -102,7 +97,7 @@ async def test_sends_to_enabled_webhooks_only(
         disabled_route = mock_router.post(disabled_url).mock(return_value=Response(204))
 
         service = WebhookService(
-            config=test_config, logger=mock_logger, http_client=mock_http_client
+            config=test_config, logger=mock_logger, http_client=http_client
         )
         await service.send(successful_record)
 
@@ -115,7 +110,7 @@ async def test_handles_network_error_gracefully(
     mock_logger: LoggerProtocol,
     test_config: ConfigManager,
     successful_record: DownloadRecord,
-    mock_http_client: httpx.AsyncClient,
+    http_client: httpx.AsyncClient,
 ):
     """测试 webhook 网络错误"""
     webhook_url = "https://discord.com/api/webhooks/789/fail"
@@ -135,7 +130,7 @@ async def test_handles_network_error_gracefully(
         )
 
         service = WebhookService(
-            config=test_config, logger=mock_logger, http_client=mock_http_client
+            config=test_config, logger=mock_logger, http_client=http_client
         )
         await service.send(successful_record)
 
@@ -149,7 +144,7 @@ async def test_handles_http_error_response_gracefully(
     mock_logger: LoggerProtocol,
     test_config: ConfigManager,
     successful_record: DownloadRecord,
-    mock_http_client: httpx.AsyncClient,
+    http_client: httpx.AsyncClient,
 ):
     """测试 webhook 返回 HTTP 错误状态码"""
     webhook_url = "https://discord.com/api/webhooks/404/notfound"
@@ -165,7 +160,7 @@ async def test_handles_http_error_response_gracefully(
         mock_router.post(webhook_url).mock(return_value=Response(404, text="Not Found"))
 
         service = WebhookService(
-            config=test_config, logger=mock_logger, http_client=mock_http_client
+            config=test_config, logger=mock_logger, http_client=http_client
         )
         await service.send(successful_record)
 
@@ -179,15 +174,57 @@ async def test_does_nothing_if_no_webhooks_configured(
     mock_logger: LoggerProtocol,
     test_config: ConfigManager,
     successful_record: DownloadRecord,
-    mock_http_client: httpx.AsyncClient,
+    http_client: httpx.AsyncClient,
 ):
     """测试当没有配置任何 webhook 时不执行任何操作"""
     await test_config.update({"webhooks": []})
 
     with respx.mock as mock_router:
         service = WebhookService(
-            config=test_config, logger=mock_logger, http_client=mock_http_client
+            config=test_config, logger=mock_logger, http_client=http_client
         )
         await service.send(successful_record)
 
         mock_logger.error.assert_not_called()
+
+
+async def test_sends_webhooks_concurrently(
+    mock_logger: LoggerProtocol,
+    test_config: ConfigManager,
+    successful_record: DownloadRecord,
+    http_client: httpx.AsyncClient,
+):
+    """测试多个 webhook 并发发送，单个失败不影响其他 webhook"""
+    urls = [f"https://discord.com/api/webhooks/{i}/hook" for i in range(3)]
+    await test_config.update(
+        {
+            "webhooks": [
+                WebhookConfig(name=f"Hook {i}", url=HttpUrl(url), enabled=True)
+                for i, url in enumerate(urls)
+            ]
+        }
+    )
+
+    in_flight = max_in_flight = 0
+
+    async def slow_response(request: httpx.Request) -> Response:
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await anyio.sleep(0.01)
+        in_flight -= 1
+        return Response(500 if request.url == urls[1] else 204)
+
+    with respx.mock as mock_router:
+        for url in urls:
+            mock_router.post(url).mock(side_effect=slow_response)
+
+        service = WebhookService(
+            config=test_config, logger=mock_logger, http_client=http_client
+        )
+        await service.send(successful_record)
+
+    assert max_in_flight == 3
+    assert mock_logger.info.call_count == 2
+    mock_logger.error.assert_called_once()
+    assert "Webhook 通知发送失败 - Hook 1" in mock_logger.error.call_args.args[0]